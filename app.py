@@ -1,21 +1,28 @@
 import streamlit as st
 import streamlit.components.v1 as components
 from pathlib import Path
-import json
-from datetime import datetime, timedelta
-import random
-from scripts.scoring       import score_responses
-from scripts.timer         import countdown, countdown_seconds
-from scripts.audio_handler import record_audio
-from scripts.tts_stt        import speak_text, transcribe_audio
-from scripts.helpers       import chunk_dict
-import time
+from scripts.scoring       import score_session, free_recall_hits, is_match
+from scripts.timer         import interference_task
+from scripts.speech         import (spoken_answer, spoken_passage, await_answer,
+                                    answer_confidence, cancel_answers, has_recording,
+                                    speak, play_speech)
+from scripts                import tts_cache
+from scripts.helpers       import merge_transcripts
+from scripts.stt_backends   import warm_up
+from scripts.model_registry import MODEL_SIZE
+from scripts.tts_stt        import WORD_MODEL_SIZE
+from scripts.history_store  import HistoryStore, now
+from scripts.catalog        import build_catalog, fingerprint
+from scripts                import norms
+from scripts.session_state  import SessionState, Phase, Cue
+from scripts.audio_archive  import shared_archive
+from scripts                import metrics
+from scripts.export         import export_session
+import os
+import uuid
 
 def show_progress():
-    phase_order = ["demographics", "instructions", "controlled", "immediate",
-                   "interference", "free_recall", "cued_recall", "results"]
-    current = phase_order.index(st.session_state["phase"])
-    st.progress(current / (len(phase_order) - 1))
+    st.progress(S.progress)
 
 def inject_big_button_css():
     st.markdown(
@@ -33,39 +40,62 @@ inject_big_button_css()
 BASE_DIR     = Path(__file__).parent
 TESTS_DIR    = BASE_DIR / "tests"
 DATA_DIR     = BASE_DIR.parent / "data"
-HISTORY_PATH = DATA_DIR / "history.json"
+HISTORY_PATH = DATA_DIR / "history.json"     # legacy, migrated on first start
+HISTORY_DB   = Path(os.environ.get("REMINDFUL_HISTORY_DB", DATA_DIR / "history.db"))
+CHECKPOINT_DAYS = float(os.environ.get("REMINDFUL_CHECKPOINT_DAYS", "7"))   # unfinished tests kept
 DATA_DIR.mkdir(exist_ok=True)
 
-# — LOAD VERSIONS & HISTORY —————————————————————————————
-versions = sorted(p.stem for p in TESTS_DIR.glob("*.json"))
-history  = {}
-if HISTORY_PATH.exists():
-    try:
-        history = json.loads(HISTORY_PATH.read_text())
-    except json.JSONDecodeError:
-        history = {}
+# — WHISPER WARM-UP (once per server process) ———————————————
+@st.cache_resource(show_spinner=False)
+def warm_whisper():
+    # passages use the main model, single-word answers the small one
+    return [warm_up(size) for size in dict.fromkeys((MODEL_SIZE, WORD_MODEL_SIZE))]
 
-# We pick the next version after user logs in, so leave user_id blank for now
-selected_version = versions[0]  # placeholder until login to history
-with open(TESTS_DIR / f"{selected_version}.json") as f:
-    study_words  = json.load(f)
-study_sheets = chunk_dict(study_words, 4)
+if os.environ.get("REMINDFUL_WHISPER_WARMUP", "0") == "1":
+    warm_whisper()
+
+# — LOAD VERSIONS & HISTORY —————————————————————————————
+@st.cache_resource(show_spinner=False)
+def history_store() -> HistoryStore:
+    store = HistoryStore(HISTORY_DB)
+    if HISTORY_PATH.exists():
+        store.migrate_json(HISTORY_PATH)
+    store.expire_checkpoints(CHECKPOINT_DAYS)
+    return store
+
+# Parsed once per process; the fingerprint argument rebuilds it when a
+# tests/*.json file is added or edited
+@st.cache_resource(show_spinner=False, max_entries=2)
+def version_catalog(_tests_dir: Path, files: tuple):
+    return build_catalog(_tests_dir)
+
+test_files = fingerprint(TESTS_DIR)
+catalog    = version_catalog(TESTS_DIR, test_files)
+store      = history_store()
 
 # — INITIALIZE STATE ———————————————————————————————————
-if "phase" not in st.session_state:
-    st.session_state["phase"]               = "demographics"  # start here
-    st.session_state["sheet_index"]         = 0
-    st.session_state["item_index"]          = 0
-    st.session_state["imm_correct"]         = {}
-    st.session_state["responses_immediate"] = {}
-    st.session_state["free_transcript"]     = []
-    st.session_state["cued_responses"]      = {}
-    # also placeholders for demographics
-    st.session_state["age"]      = None
-    st.session_state["worry"]    = None
-    st.session_state["why_worry"]= ""
-    st.session_state["research_consent_name"] = ""
-    st.session_state["use_audio"] = False
+# Everything about this participant's progress lives in one SessionState.
+# An unfinished test resumes from its page link (?resume=<session id>): the
+# id is random, so only the browser that started the test can pick it up.
+if "state" not in st.session_state:
+    unfinished = store.get_checkpoint(st.query_params.get("resume", ""))
+    st.session_state["state"] = (SessionState.loads(unfinished) if unfinished else
+                                 SessionState(uuid.uuid4().hex, now(),
+                                              n_cues=len(catalog.default.words)))
+S = st.session_state["state"]
+
+# Until login the first version is shown; "Begin Test" picks the user's next one
+version          = catalog.get(S.version, catalog.default)
+selected_version = version.name
+study_words      = version.words
+study_sheets     = version.sheets
+
+# — PRE-RENDER SPOKEN CUES (background, once per process) ——————————
+@st.cache_resource(show_spinner=False)
+def prerender_cues(files: tuple):
+    return tts_cache.prerender(v.words for v in catalog.versions)
+
+prerender_cues(test_files)
 
 def setup_demographics_and_consent():
     st.title("🧠 Remindful Memory Assessment")
@@ -76,11 +106,11 @@ def setup_demographics_and_consent():
 
     # Age
     st.subheader("Your Age")
-    st.session_state["age"] = st.slider("Age", 18, 100, 30, format="%d")
+    S.demographics["age"] = st.slider("Age", 18, 100, 30, format="%d")
 
     # Likert worry scale
     st.subheader("How worried are you about your memory?")
-    st.session_state["worry"] = st.select_slider(
+    S.demographics["worry"] = st.select_slider(
         "Select one:",
         options=[
             "Not at all worried",
@@ -100,9 +130,8 @@ def setup_demographics_and_consent():
     # Research consent name
     st.subheader("Research Consent")
     st.write("Type your full name below to consent to keeping your data for research purposes:")
-    st.session_state["research_consent_name"] = st.text_input(
-        "Full name", value="", key="research_name"
-    )
+    name = st.text_input("Full name", value="", key="research_name")
+    S.user_id = name.strip().lower()
 
     # Informed consent form placeholder
     st.subheader("Informed Consent Document")
@@ -111,22 +140,25 @@ def setup_demographics_and_consent():
 
     # Audio opt-in
     st.subheader("Audio Recording Preference")
-    st.session_state["use_audio"] = st.checkbox(
+    S.demographics["use_audio"] = st.checkbox(
         "I agree to have my spoken answers recorded (recommended for accuracy)",
         value=True
     )
 
     # Begin Test
     if st.button("Begin Test"):
-        if not st.session_state["research_consent_name"]:
+        if not S.user_id:
             st.error("Please type your full name to consent for research.")
             return False
-        st.session_state["phase"] = "instructions"
+        S.demographics["why_worry"] = st.session_state.get("why_worry", "")
+        chosen = catalog.next_for(store.completed_count(S.user_id))
+        S.version, S.n_cues, S.flags = chosen.name, len(chosen.words), bytearray(len(chosen.words))
+        S.go(Phase.INSTRUCTIONS)
         return True
     return False 
 def instructions():
     """Display plain-language, non-plagiarised test instructions."""
-    if st.session_state["phase"] != "instructions":
+    if S.phase != Phase.INSTRUCTIONS:
         return
 
     st.header("📋  Welcome to the Remindful Memory Check")
@@ -173,40 +205,72 @@ def instructions():
         """
     )
 
+    st.caption("If you get interrupted, reopen this page's link to carry on where you left off.")
+
     if st.button("Start the Test"):
-        st.session_state["phase"] = "controlled"
+        S.go(Phase.CONTROLLED)
+def save_session(scores: dict | None = None):
+    """Write this session's record to the history store (one transaction)."""
+    if S.audio_clips:
+        shared_archive().link(S.session_id, S.audio_clips)
+    store.save_session(
+        S.session_id,
+        user_id=S.user_id,
+        version=selected_version,
+        demographics=S.demographics,
+        responses={"immediate": S.responses_immediate,
+                   "free": S.free_transcript,
+                   "cued": S.cued_responses,
+                   "confidence": S.confidence,
+                   "interference": S.interference,
+                   "audio_paths": S.audio_paths},
+        scores=scores,
+        timings=S.timings,
+        started_at=S.started_at,
+        completed_at=now() if scores is not None else None,
+    )
+
+def checkpoint():
+    """Save the in-progress state whenever it changed, so the test can be resumed."""
+    if S.phase in (Phase.DEMOGRAPHICS, Phase.RESULTS) or not S.user_id:
+        return
+    blob = S.dumps()
+    if blob != st.session_state.get("_checkpoint"):
+        store.save_checkpoint(S.session_id, S.user_id, blob)
+        st.session_state["_checkpoint"] = blob
+    if st.query_params.get("resume") != S.session_id:
+        st.query_params["resume"] = S.session_id
+
 def main():
+    phase = S.phase.name.lower()
+    metrics.inc("reruns", phase=phase)
+    with metrics.span("rerun", phase=phase):
+        render()
+
+def render():
+    S.timings.setdefault(S.phase.name.lower(), now())
     show_progress()
     # Demographics & Consent
-    if st.session_state["phase"] == "demographics":
+    if S.phase == Phase.DEMOGRAPHICS:
         if not setup_demographics_and_consent():
             return
 
     # Instructions page
-    if st.session_state["phase"] == "instructions":
+    if S.phase == Phase.INSTRUCTIONS:
         instructions()
 
     # Test phases
-    phase = st.session_state["phase"]
-    if phase == "controlled":
-        controlled_learning()
-    elif phase == "immediate":
-        immediate_cued_recall()
-    elif phase == "interference":
-        interference_phase()
-    elif phase == "free_recall":
-        free_recall_phase()
-    elif phase == "cued_recall":
-        cued_recall_phase()
-    elif phase == "results":
-        show_results()
+    PHASE_VIEWS.get(S.phase, lambda: None)()
+
+    checkpoint()
+    play_speech()
 
 def controlled_learning():
-    if st.session_state["phase"] != "controlled":
+    if S.phase != Phase.CONTROLLED:
         return
 
-    idx      = st.session_state["sheet_index"]
-    item_idx = st.session_state["item_index"]
+    idx      = S.sheet_index
+    item_idx = S.item_index
     sheet    = study_sheets[idx]
     cues     = list(sheet.keys())
     cue      = cues[item_idx]
@@ -221,15 +285,10 @@ def controlled_learning():
     """, height=0)
 
     # at start of controlled_learning()
-    cue_key = f"spoken_{idx}_{item_idx}"
-    if not st.session_state.get(cue_key):
-        components.html(f"""
-            <script>
-              const msg = new SpeechSynthesisUtterance("The Category is: {cue}");
-              window.speechSynthesis.speak(msg);
-            </script>
-        """, height=0)
-        st.session_state[cue_key] = True
+    i = version.cue_index[cue]
+    if not S.has(i, Cue.LEARN_SPOKEN):
+        speak(tts_cache.CUE_PROMPT.format(cue=cue))
+        S.mark(i, Cue.LEARN_SPOKEN)
 
     # Header & Cue
     st.header(f"Controlled Learning — Sheet {idx+1} of {len(study_sheets)}")
@@ -246,18 +305,18 @@ def controlled_learning():
             )
             if st.button("Select", key=f"ctrl_{idx}_{item_idx}_{i}"):
                 # Record if opted in
-                if st.session_state.get("use_audio", False):
+                if S.use_audio:
                     st.info("Press Record and say the matching word, then click its card.")
-                    audio_learn = record_audio(key=f"learn_pre_{idx}_{item_idx}")
-                    if audio_learn:
-                        said = transcribe_audio(audio_learn).strip().lower()
+                    said = spoken_answer(f"learn_pre_{idx}_{item_idx}", vocabulary=study_words.values())
+                    if said is not None:
+                        said = said.strip().lower()
                         st.write(f"You said: **{said}**")
                 # Check click
                 if word == target:
                     st.success("✅ Correct!")
-                    st.session_state["item_index"] += 1
-                    if st.session_state["item_index"] >= len(cues):
-                        st.session_state["phase"] = "immediate"
+                    S.item_index += 1
+                    if S.item_index >= len(cues):
+                        S.go(Phase.IMMEDIATE)
                     return
                 else:
                     st.error(f"❌ Not quite—correct word was **{target}**.")
@@ -265,39 +324,34 @@ def controlled_learning():
 
 def immediate_cued_recall():
     """Single-cue immediate recall with optional audio, one retry allowed."""
-    if st.session_state["phase"] != "immediate":
+    if S.phase != Phase.IMMEDIATE:
         return
 
-    idx   = st.session_state["sheet_index"]     # 0-based sheet number
+    idx   = S.sheet_index                       # 0-based sheet number
     sheet = study_sheets[idx]                   # {cue: word}
-
-    # --- create / fetch per-sheet correctness tracker ------------------
-    flags = st.session_state["imm_correct"].setdefault(
-        idx, {cue: False for cue in sheet}
-    )
+    on_sheet = [version.cue_index[c] for c in sheet]
 
     # --- pick the first cue still unanswered --------------------------
-    try:
-        cue, word = next((c, w) for c, w in sheet.items() if not flags[c])
-    except StopIteration:
+    i = S.first_without(Cue.IMM_DONE, among=on_sheet)
+    if i is None:
         # All four cues done → move on
-        st.session_state["sheet_index"] += 1
-        st.session_state["item_index"] = 0
-        st.session_state["phase"] = "controlled" if st.session_state["sheet_index"] < len(study_sheets) else "interference"
+        S.sheet_index += 1
+        S.item_index = 0
+        S.go(Phase.CONTROLLED if S.sheet_index < len(study_sheets) else Phase.INTERFERENCE)
         st.experimental_rerun()
         return
+    cue  = list(sheet)[on_sheet.index(i)]
+    word = sheet[cue]
 
     # ------------------------------------------------------------------
     st.header(f"Immediate Recall — Sheet {idx+1}/{len(study_sheets)}")
-    done = sum(flags.values())
+    done = S.count(Cue.IMM_DONE, among=on_sheet)
     st.progress(done/4, text=f"{done}/4 cues finished")
 
     # --- speak cue only once ------------------------------------------
-    spoken_key = f"imm_spoken_{idx}_{cue}"
-    if not st.session_state.get(spoken_key):
-        speak_text(f"The category is {cue}.")
-        time.sleep(1.2)  # ensure mic is free
-        st.session_state[spoken_key] = True
+    if not S.has(i, Cue.IMM_SPOKEN):
+        speak(tts_cache.CUE_PROMPT.format(cue=cue))
+        S.mark(i, Cue.IMM_SPOKEN)
 
     st.markdown(f"### What was the **{cue}**?")
 
@@ -305,182 +359,161 @@ def immediate_cued_recall():
     typed = st.text_input("Type here (or leave blank if recording):",
                           key=f"imm_type_{idx}_{cue}")
     audio_resp = None
-    if st.session_state.get("use_audio", False):
-        audio_file = record_audio(key=f"imm_audio_{idx}_{cue}")
-        if audio_file:
-            audio_resp = transcribe_audio(audio_file).strip().lower()
+    if S.use_audio:
+        said = spoken_answer(f"imm_audio_{idx}_{cue}", vocabulary=study_words.values())
+        if said is not None:
+            audio_resp = said.strip().lower()
             st.write(f"You said: **{audio_resp}**")
 
-    # Flag to know whether we've already offered a retry
-    retry_flag = st.session_state.get(f"imm_retry_{idx}_{cue}", False)
-
     if st.button("Next", key=f"imm_next_{idx}_{cue}"):
+        if audio_resp is None and not typed.strip():
+            # transcript may still be in flight — wait for it now
+            audio_resp = (await_answer(f"imm_audio_{idx}_{cue}") or "").strip().lower()
         response = (audio_resp or typed).strip().lower()
         if not response:
             st.warning("Please type or say a word before continuing.")
             st.stop()
 
-        if response == word.lower():
+        # first attempt is what immediate recall is scored on
+        if cue not in S.responses_immediate and audio_resp:
+            S.confidence.setdefault("immediate", {})[cue] = \
+                answer_confidence(f"imm_audio_{idx}_{cue}")
+        S.responses_immediate.setdefault(cue, response)
+        if is_match(response, word):
             st.success("✅ Correct!")
-            flags[cue] = True
+            S.mark(i, Cue.IMM_DONE)
             st.experimental_rerun()
 
-        if not retry_flag:
+        if not S.has(i, Cue.IMM_RETRY):
             # first miss → give guided retry
-            st.session_state[f"imm_retry_{idx}_{cue}"] = True
-            speak_text(f"The correct answer was {word}. Let's try again. What was the {cue}?")
+            S.mark(i, Cue.IMM_RETRY)
+            speak(tts_cache.RETRY_PROMPT.format(cue=cue, word=word))
             st.experimental_rerun()
         else:
             # second miss → mark finished and move on
             st.error(f"❌ We'll move on. The word was **{word}**.")
-            flags[cue] = True
+            S.mark(i, Cue.IMM_DONE)
             st.experimental_rerun()
 
 
 def interference_phase():
     """Interactive distraction task: tap when the number is a multiple of 3."""
-    if st.session_state["phase"] != "interference":
+    if S.phase != Phase.INTERFERENCE:
         return
 
     st.header("🧩 Distraction Round (20 s)")
 
-    # ---------- first visit ----------
-    if "int_start" not in st.session_state:
+    # The number stream, tap handling and clock all run in the browser, so
+    # the task costs one rerun (when it reports back) instead of one per tap
+    result = S.interference
+    if result is None:
         st.markdown(
             """
             For the next 20 seconds you’ll see random numbers.  
             **Press the green Tap button whenever a number is divisible by 3.**  
             """
         )
-        if st.button("Begin"):
-            st.session_state["int_start"] = datetime.now()
-            st.session_state["int_end"]   = st.session_state["int_start"] + timedelta(seconds=20)
-            st.session_state["int_hits"]  = 0
-            st.session_state["int_num"]   = None
-            st.experimental_rerun()
-        return
-
-    # ---------- task in-progress ----------
-    remaining = (st.session_state["int_end"] - datetime.now()).total_seconds()
-
-    if remaining <= 0:
-        st.success(f"Time’s up! You caught **{st.session_state['int_hits']}** multiples of 3 🎉")
-        if st.button("Continue to Recall"):
-            for k in ("int_start", "int_end", "int_hits", "int_num"):
-                st.session_state.pop(k, None)
-            st.session_state["phase"] = "free_recall"
-            st.experimental_rerun()
-        return
-
-    # show / refresh random number
-    if st.session_state["int_num"] is None or st.button("Next number"):
-        st.session_state["int_num"] = random.randint(10, 99)
-
-    st.markdown(f"<h1 style='text-align:center'>{st.session_state['int_num']}</h1>", unsafe_allow_html=True)
-
-    # big tap button
-    if st.button("✅ Tap", key="tap_btn"):
-        if st.session_state["int_num"] % 3 == 0:
-            st.session_state["int_hits"] += 1
-        st.session_state["int_num"] = random.randint(10, 99)
+        result = interference_task(seconds=20, key="int_task")
+        if result is None:
+            return
+        S.interference = result
 
-    # visual timer bar
-    st.progress((20 - remaining) / 20)
+    st.success(f"Time’s up! You caught **{result['hits']}** multiples of 3 🎉")
+    if st.button("Continue to Recall"):
+        S.go(Phase.FREE_RECALL)
+        st.experimental_rerun()
 
 def free_recall_phase():
-    if st.session_state["phase"] != "free_recall":
+    if S.phase != Phase.FREE_RECALL:
         return
 
     st.header("Free Recall (90 s)")
     st.write("Say (or type) all the words you remember.")
 
-    if st.session_state.get("use_audio", False):
-        audio_file = record_audio(key="free_recall")
-        if audio_file:
-            txt = transcribe_audio(audio_file)
-            st.session_state["free_transcript"] = txt.split()
-            st.write("You said:", st.session_state["free_transcript"])
+    if S.use_audio:
+        # each take starts transcribing as soon as it's stopped, so the
+        # participant can keep talking in a new take while it decodes
+        takes = S.free_takes
+        parts = [spoken_passage(f"free_recall_{n}") for n in range(takes)]
+        if any(parts):
+            S.free_transcript = merge_transcripts([p for p in parts if p]).split()
+            st.write("You said:", S.free_transcript)
+        if has_recording(f"free_recall_{takes - 1}") and st.button("➕ Record more words"):
+            S.free_takes += 1
+            st.experimental_rerun()
     else:
         txt = st.text_area("Type remembered words, separated by commas:", height=220)
         if txt:
-            st.session_state["free_transcript"] = [w.strip() for w in txt.split(",") if w.strip()]
+            S.free_transcript = [w.strip() for w in txt.split(",") if w.strip()]
 
     if st.button("Done Free Recall"):
-        st.session_state["phase"] = "cued_recall"
+        if S.use_audio:
+            takes = S.free_takes
+            parts = [await_answer(f"free_recall_{n}") for n in range(takes)]
+            if any(parts):
+                S.free_transcript = merge_transcripts([p for p in parts if p]).split()
+            cancel_answers()
+        # only the words missed here get a cue in the next phase
+        recalled = free_recall_hits(study_words, S.free_transcript)
+        for cue, i in version.cue_index.items():
+            if cue not in recalled:
+                S.mark(i, Cue.CUED_ASKED)
+        S.go(Phase.CUED_RECALL)
 
 def cued_recall_phase():
     """Final cued recall — typed or spoken answer with Next button."""
-    if st.session_state["phase"] != "cued_recall":
+    if S.phase != Phase.CUED_RECALL:
         return
 
     # figure out which cue we’re on
-    if "cue_iter" not in st.session_state:
-        st.session_state["cue_iter"] = iter([
-            (cue, word) for cue, word in study_words.items()
-            if word.lower() not in
-               {w.lower() for w in st.session_state["free_transcript"]}
-        ])
-
-    try:
-        cue, word = st.session_state.get("current_cue", next(st.session_state["cue_iter"]))
-        st.session_state["current_cue"] = (cue, word)
-    except StopIteration:
+    i = S.next_cued()
+    if i is None:
         # all cues handled → results
-        st.session_state.pop("cue_iter", None)
-        st.session_state.pop("current_cue", None)
-        st.session_state["phase"] = "results"
+        S.go(Phase.RESULTS)
         st.experimental_rerun()
         return
+    cue = list(study_words)[i]
 
     st.header("Cued Recall")
     st.markdown(f"### What was the **{cue}**?")
 
     typed = st.text_input("Type here (optional):", key=f"cr_type_{cue}")
     audio_resp = None
-    if st.session_state.get("use_audio", False):
-        audio_file = record_audio(key=f"cr_audio_{cue}")
-        if audio_file:
-            audio_resp = transcribe_audio(audio_file).strip().lower()
+    if S.use_audio:
+        said = spoken_answer(f"cr_audio_{cue}", vocabulary=study_words.values())
+        if said is not None:
+            audio_resp = said.strip().lower()
             st.write(f"You said: **{audio_resp}**")
 
     if st.button("Next", key=f"cr_next_{cue}"):
+        if audio_resp is None and not typed.strip():
+            audio_resp = (await_answer(f"cr_audio_{cue}") or "").strip().lower()
         response = (audio_resp or typed).strip().lower()
         # store even blank to mark progression
-        st.session_state["cued_responses"][cue] = response
+        S.cued_responses[cue] = response
+        if audio_resp:
+            S.confidence.setdefault("cued", {})[cue] = answer_confidence(f"cr_audio_{cue}")
         # proceed to next cue
-        st.session_state.pop("current_cue", None)
+        S.mark(i, Cue.CUED_DONE)
         st.experimental_rerun()
 
     if st.button("See Results"):
-        st.session_state["phase"] = "results"
+        S.go(Phase.RESULTS)
 
 def show_results():
-    if st.session_state["phase"] != "results":
+    if S.phase != Phase.RESULTS:
         return
 
-    # Immediate Recall
-    imm_score, _ = score_responses(
-        study_words, st.session_state["responses_immediate"]
-    )
-    # Free Recall
-    free_norm = {w.lower() for w in st.session_state["free_transcript"]}
-    free_score= sum(1 for w in study_words.values() if w.lower() in free_norm)
-    # Cued Recall & Intrusions
-    missed     = {
-        cue:word for cue,word in study_words.items()
-        if word.lower() not in free_norm
-    }
-    cr_resp    = st.session_state["cued_responses"]
-    cr_score   = sum(
-        1 for cue,word in missed.items()
-        if cr_resp.get(cue,"").lower().strip() == word.lower()
-    )
-    intrusions = sum(
-        1 for cue,resp in cr_resp.items()
-        if cue in missed and resp.lower().strip() != missed[cue].lower()
-    )
+    scores = score_session(study_words, S.responses_immediate,
+                           S.free_transcript, S.cued_responses)
+    imm_score, free_score, cr_score = scores.immediate, scores.free, scores.cued
+    intrusions = scores.intrusions
+    missed     = scores.missed
 
-    total = imm_score + free_score + cr_score
+    if not S.saved:
+        save_session(scores.totals())
+        norms.record(store, S.demographics, scores.totals())
+        S.saved = True
 
     st.header("Your Memory Snapshot")
 
@@ -493,23 +526,45 @@ def show_results():
         st.metric("Intrusions",       intrusions)
     
     st.subheader("What do these numbers mean?")
+    norm = norms.lookup(store, S.demographics.get("age"), S.demographics.get("worry"),
+                        "free", free_score)
+    if norm:
+        group = "people" if norm["age_band"] == norms.ANY else f"people aged {norm['age_band']}"
+        if norm["worry"] != norms.ANY:
+            group += f" who felt “{norm['worry'].lower()}”"
+        free_line = (f"Your free recall score is at about the **{norm['percentile']:.0f}th "
+                     f"percentile** of {norm['n']:,} {group} who took this test "
+                     f"(average {norm['mean']:.1f}).")
+    else:
+        free_line = "Most healthy adults score **10–14** on free recall and improve with cues."
     st.write(
-        """
-        • Most healthy adults score **10–14** on free recall and improve with cues.  
+        f"""
+        • {free_line}  
         • Intrusions (words that weren't on the list) are common; one or two is normal.  
         • If you are concerned about your memory, share these results with a healthcare
           professional—they can place them in the context of a full assessment.
         """
     )
     
-    st.download_button("📥 Download my results", data=str({
-            "immediate": imm_score,
-            "free": free_score,
-            "cued": cr_score,
-            "intrusions": intrusions,
-            "total": total
-        }),
-        file_name="Remindful_results.txt")
+    fmt = st.selectbox("File format", ["json", "csv", "parquet"],
+                       format_func={"json": "JSON", "csv": "CSV (one row per word)",
+                                    "parquet": "Parquet"}.get)
+    try:
+        data, mime, ext = export_session(store.get_session(S.session_id), scores, fmt)
+    except ImportError:
+        st.info("Parquet export needs pyarrow on the server; choose JSON or CSV.")
+    else:
+        st.download_button("📥 Download my results", data=data, mime=mime,
+                           file_name=f"Remindful_results.{ext}")
     
+PHASE_VIEWS = {
+    Phase.CONTROLLED:   controlled_learning,
+    Phase.IMMEDIATE:    immediate_cued_recall,
+    Phase.INTERFERENCE: interference_phase,
+    Phase.FREE_RECALL:  free_recall_phase,
+    Phase.CUED_RECALL:  cued_recall_phase,
+    Phase.RESULTS:      show_results,
+}
+
 if __name__ == "__main__":
     main()
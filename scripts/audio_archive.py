@@ -0,0 +1,227 @@
+"""
+Research audio archive: content-addressed, compressed, with retention.
+
+Each recording is stored once under the hash of its 16 kHz mono PCM
+(audio/archive/ab/abcdef….flac), so reruns and re-submitted clips cost
+nothing. Transcoding to FLAC (lossless) or Opus runs on a background
+thread. A manifest in the history database links clips to the sessions
+and answers they belong to; clips older than the retention period, or the
+oldest ones once the archive is over its size quota, are deleted.
+
+    python -m scripts.audio_archive --stats
+    python -m scripts.audio_archive --enforce
+"""
+from __future__ import annotations
+import argparse
+import hashlib
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+from shutil import which
+from typing import TYPE_CHECKING
+from scripts.history_store import HistoryStore, now
+from scripts import metrics
+
+if TYPE_CHECKING:               # pydub is only imported once a clip is archived
+    from pydub import AudioSegment
+
+BASE_DIR      = Path(__file__).resolve().parent.parent
+ARCHIVE_DIR   = Path(os.environ.get("REMINDFUL_ARCHIVE_DIR", BASE_DIR / "audio" / "archive"))
+DB_PATH       = Path(os.environ.get("REMINDFUL_HISTORY_DB", BASE_DIR.parent / "data" / "history.db"))
+FORMAT        = os.environ.get("REMINDFUL_ARCHIVE_FORMAT", "flac")      # flac | opus | wav
+RETENTION     = int(os.environ.get("REMINDFUL_AUDIO_RETENTION_DAYS", "365"))
+QUOTA_MB      = int(os.environ.get("REMINDFUL_AUDIO_QUOTA_MB", "2048"))
+SAMPLE_RATE   = 16_000    # all the models ever need
+ENFORCE_EVERY = 100       # writes between retention sweeps
+
+EXPORT_ARGS = {
+    "flac": {"format": "flac"},
+    "opus": {"format": "opus", "codec": "libopus", "bitrate": "24k"},
+    "wav":  {"format": "wav"},
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS audio_clips (
+    digest     TEXT PRIMARY KEY,
+    path       TEXT    NOT NULL,
+    format     TEXT    NOT NULL,
+    bytes      INTEGER NOT NULL,
+    seconds    REAL    NOT NULL,
+    created_at TEXT    NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_audio_clips_created ON audio_clips (created_at);
+CREATE TABLE IF NOT EXISTS audio_links (
+    session_id TEXT NOT NULL,
+    key        TEXT NOT NULL,
+    digest     TEXT NOT NULL,
+    PRIMARY KEY (session_id, key)
+);
+CREATE INDEX IF NOT EXISTS idx_audio_links_digest ON audio_links (digest);
+"""
+
+
+def digest_of(segment: AudioSegment) -> str:
+    """Content hash of a recording after normalising it to the archive format."""
+    return hashlib.sha1(segment.raw_data).hexdigest()
+
+
+def normalise(segment: AudioSegment) -> AudioSegment:
+    return segment.set_channels(1).set_frame_rate(SAMPLE_RATE).set_sample_width(2)
+
+
+class AudioArchive:
+    """Hash-named clip storage with a manifest, retention period and size quota."""
+
+    def __init__(self, store: HistoryStore, root=ARCHIVE_DIR, fmt: str = FORMAT,
+                 retention_days: int = RETENTION, quota_mb: int = QUOTA_MB):
+        if fmt not in EXPORT_ARGS:
+            raise ValueError(f"unknown archive format {fmt!r}")
+        # FLAC/Opus go through ffmpeg; without it keep plain WAV
+        self.fmt   = fmt if fmt == "wav" or which("ffmpeg") else "wav"
+        self.root  = Path(root)
+        self.store = store
+        self.retention   = timedelta(days=retention_days)
+        self.quota_bytes = quota_mb * 1024 * 1024
+        self.root.mkdir(parents=True, exist_ok=True)
+        store.connection().executescript(SCHEMA)
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="audio-archive")
+        self._writes = 0
+        self._lock   = threading.Lock()
+
+    def path_for(self, digest: str) -> Path:
+        """Where a new clip is written, in the current format."""
+        return self.root / digest[:2] / f"{digest}.{self.fmt}"
+
+    def stored_path(self, digest: str) -> Path | None:
+        """The file a clip was archived to, whatever format it was in then."""
+        row = self.store.connection().execute(
+            "SELECT path FROM audio_clips WHERE digest = ?", (digest,)).fetchone()
+        return Path(row[0]) if row and Path(row[0]).exists() else None
+
+    # — WRITES ——————————————————————————————————————————
+    def submit(self, segment: AudioSegment) -> tuple[str, Path, Future]:
+        """
+        Archive `segment` in the background. Returns (digest, final path,
+        future) straight away; the file appears once the future is done.
+        """
+        segment = normalise(segment)
+        digest  = digest_of(segment)
+        path    = self.stored_path(digest) or self.path_for(digest)
+        return digest, path, self._writer.submit(self._write, segment, digest)
+
+    def _write(self, segment: AudioSegment, digest: str):
+        conn   = self.store.connection()
+        stored = self.stored_path(digest)
+        metrics.inc("archive_writes", deduplicated=stored is not None)
+        path, fmt = stored, stored.suffix[1:] if stored else self.fmt
+        if stored is None:
+            path = self.path_for(digest)
+            path.parent.mkdir(exist_ok=True)
+            tmp = path.with_suffix(".part")
+            with metrics.span("archive_encode", format=self.fmt):
+                segment.export(str(tmp), **EXPORT_ARGS[self.fmt])
+            os.replace(tmp, path)
+        with conn:
+            # re-archiving a clip refreshes its retention clock
+            conn.execute(
+                """
+                INSERT INTO audio_clips VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (digest) DO UPDATE SET
+                    path = excluded.path, format = excluded.format,
+                    bytes = excluded.bytes, created_at = excluded.created_at
+                """,
+                (digest, str(path), fmt, path.stat().st_size,
+                 len(segment) / 1000, now()))
+        with self._lock:
+            self._writes += 1
+            due = self._writes % ENFORCE_EVERY == 0
+        if due:
+            self.enforce()
+
+    def link(self, session_id: str, clips: dict):
+        """Record which archived clip ({key: digest}) answered which prompt."""
+        if not clips:
+            return
+        with self.store.connection() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO audio_links VALUES (?, ?, ?)",
+                [(session_id, key, digest) for key, digest in clips.items()])
+
+    # — READS ———————————————————————————————————————————
+    def clips_for(self, session_id: str) -> dict:
+        """{key: path} of a session's archived clips that still exist."""
+        rows = self.store.connection().execute(
+            """
+            SELECT l.key, c.path FROM audio_links l JOIN audio_clips c USING (digest)
+            WHERE l.session_id = ?
+            """, (session_id,))
+        return {key: path for key, path in rows}
+
+    def stats(self) -> dict:
+        n, size, secs = self.store.connection().execute(
+            "SELECT COUNT(*), COALESCE(SUM(bytes), 0), COALESCE(SUM(seconds), 0) FROM audio_clips"
+        ).fetchone()
+        return {"clips": n, "bytes": size, "seconds": secs, "format": self.fmt}
+
+    # — RETENTION ———————————————————————————————————————
+    def enforce(self) -> int:
+        """Drop expired clips, then the oldest ones until under quota. Returns clips removed."""
+        conn   = self.store.connection()
+        cutoff = (datetime.now() - self.retention).isoformat(timespec="seconds")
+        # files are deleted by their recorded path: the archive format may
+        # have changed since they were written
+        doomed = list(conn.execute(
+            "SELECT digest, path FROM audio_clips WHERE created_at < ?", (cutoff,)))
+
+        total = conn.execute("SELECT COALESCE(SUM(bytes), 0) FROM audio_clips "
+                             "WHERE created_at >= ?", (cutoff,)).fetchone()[0]
+        if total > self.quota_bytes:
+            for digest, path, size in conn.execute(
+                    "SELECT digest, path, bytes FROM audio_clips WHERE created_at >= ? "
+                    "ORDER BY created_at", (cutoff,)):
+                doomed.append((digest, path))
+                total -= size
+                if total <= self.quota_bytes:
+                    break
+
+        for _, path in doomed:
+            Path(path).unlink(missing_ok=True)
+        with conn:
+            conn.executemany("DELETE FROM audio_clips WHERE digest = ?", [(d,) for d, _ in doomed])
+            conn.executemany("DELETE FROM audio_links WHERE digest = ?", [(d,) for d, _ in doomed])
+        return len(doomed)
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+def shared_archive() -> AudioArchive:
+    """The process-wide archive, configured from the environment."""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = AudioArchive(HistoryStore(DB_PATH))
+        return _shared
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Research audio archive maintenance")
+    parser.add_argument("--db", type=Path, default=DB_PATH)
+    parser.add_argument("--root", type=Path, default=ARCHIVE_DIR)
+    parser.add_argument("--enforce", action="store_true",
+                        help="apply the retention period and size quota now")
+    parser.add_argument("--stats", action="store_true")
+    args = parser.parse_args(argv)
+    archive = AudioArchive(HistoryStore(args.db), args.root)
+    if args.enforce:
+        print(f"Removed {archive.enforce():,} clips")
+    if args.stats or not args.enforce:
+        s = archive.stats()
+        print(f"{s['clips']:,} clips, {s['seconds'] / 3600:.1f} h of audio, "
+              f"{s['bytes'] / 1e6:.1f} MB as {s['format']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,54 +1,203 @@
+from __future__ import annotations
 import streamlit as st
-from audiorecorder import audiorecorder
 from pathlib import Path
-from datetime import datetime
-from pydub import AudioSegment
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+import numpy as np
+import hashlib
+import io
+import os
+from scripts.audio_archive import shared_archive
+from scripts import metrics
+
+# pydub and the recorder component are imported on first use, so typed-only
+# sessions (and cold starts) never load them
+if TYPE_CHECKING:
+    from pydub import AudioSegment
 
 AUDIO_DIR = Path(__file__).resolve().parent.parent / "audio"
 AUDIO_DIR.mkdir(parents=True, exist_ok=True)
 
-def record_audio(key: str,
-                 start_label: str = "▶️ Record",
-                 stop_label : str = "⏹️ Stop"):
-    """
-    Shows an in-browser recorder, streams status to the user,
-    and returns the saved WAV file path (or None).
-    """
-    status = st.empty()
-    wav_data = audiorecorder(start_label, stop_label, key=key)
+SAMPLE_RATE   = 16_000   # what Whisper expects
+ARCHIVE_AUDIO = os.environ.get("REMINDFUL_ARCHIVE_AUDIO", "0") == "1"
 
-    if not wav_data:
-        status.info("Click ▶️ Record, then ⏹️ Stop when done.")
-        return None
+# Silence trimming: the clip's noise floor is the level of its quietest
+# frames (NOISE_PERCENTILE of FRAME_MS frames); speech must rise SPEECH_SNR_DB
+# above it, so quiet microphones still work and steady room noise never
+# counts. A clip whose peak stays under SPEECH_GATE_DB (dBFS) holds no
+# speech at all, nor does one with less than MIN_SPEECH_MS of it.
+FRAME_MS         = 10
+NOISE_PERCENTILE = 10
+SPEECH_SNR_DB    = float(os.environ.get("REMINDFUL_SPEECH_SNR_DB", "12"))
+SPEECH_GATE_DB   = float(os.environ.get("REMINDFUL_SILENCE_DB", "-45"))
+MIN_SPEECH_MS = 150
+SPEECH_PAD_MS = 200      # keep a little context around the speech
 
-    with status.container():
-        st.spinner("Processing your recording…")
+# Long answers are cut into overlapping chunks that decode in parallel;
+# Whisper works in 30 s windows, so chunks stay just under that
+CHUNK_S   = 25
+OVERLAP_S = 2
 
-    ...
 
-    filename = AUDIO_DIR / f"recording_{key}_{datetime.now():%Y%m%d_%H%M%S}.wav"
+@dataclass
+class Clip:
+    """A recorded answer, decoded in memory and ready for the model."""
+    key: str
+    digest: str
+    samples: np.ndarray          # mono float32 @ SAMPLE_RATE
+    path: Path | None = None     # archived copy (written in the background)
+    trimmed_ms: int = 0          # silence removed before transcription
+
+    @property
+    def seconds(self) -> float:
+        return len(self.samples) / SAMPLE_RATE
 
-    try:
-        # Bytes-like ⇒ save directly
-        if isinstance(wav_data, (bytes, bytearray)):
-            filename.write_bytes(wav_data)
 
-        # numpy / array ⇒ use tobytes()
-        elif hasattr(wav_data, "tobytes"):
-            filename.write_bytes(wav_data.tobytes())
+def clip_digest(key: str, wav_data) -> str:
+    """Content hash of a recorder payload, scoped to the widget `key`."""
+    from pydub import AudioSegment
+    if isinstance(wav_data, AudioSegment):
+        payload = b"%d:%d:%d:" % (wav_data.frame_rate, wav_data.channels,
+                                  wav_data.sample_width) + wav_data.raw_data
+    elif isinstance(wav_data, (bytes, bytearray)):
+        payload = bytes(wav_data)
+    elif hasattr(wav_data, "tobytes"):
+        payload = wav_data.tobytes()
+    else:
+        payload = bytes(wav_data)
+    return hashlib.sha1(key.encode() + b"\0" + payload).hexdigest()
 
-        # pydub.AudioSegment ⇒ export
-        elif isinstance(wav_data, AudioSegment):
-            wav_data.export(str(filename), format="wav")
+def to_segment(wav_data) -> AudioSegment:
+    """Recorder payload (bytes / numpy / AudioSegment) → AudioSegment, no ffmpeg."""
+    from pydub import AudioSegment
+    if isinstance(wav_data, AudioSegment):
+        return wav_data
+    if isinstance(wav_data, (bytes, bytearray)):
+        raw = bytes(wav_data)
+    elif hasattr(wav_data, "tobytes"):
+        raw = wav_data.tobytes()
+    else:
+        raw = bytes(wav_data)
+    # pydub parses WAV natively, so this never spawns a subprocess
+    return AudioSegment.from_wav(io.BytesIO(raw))
 
-        # Fallback
-        else:
-            filename.write_bytes(bytes(wav_data))
+def frame_levels(segment: AudioSegment, frame_ms: int = FRAME_MS) -> np.ndarray:
+    """RMS level (dBFS) of each `frame_ms` frame of a clip."""
+    samples = np.asarray(segment.get_array_of_samples(), dtype=np.float64)
+    samples /= 1 << (8 * segment.sample_width - 1)
+    size = max(1, segment.frame_rate * segment.channels * frame_ms // 1000)
+    n = len(samples) // size
+    if n == 0:
+        return np.full(1, -120.0)
+    rms = np.sqrt(np.mean(samples[:n * size].reshape(n, size) ** 2, axis=1))
+    return 20 * np.log10(np.maximum(rms, 1e-6))
+
+def silence_threshold(segment: AudioSegment) -> float | None:
+    """
+    dBFS below which this clip is treated as silence: SPEECH_SNR_DB over
+    its noise floor. None when the clip never gets loud enough to hold speech.
+    """
+    if segment.max_dBFS < SPEECH_GATE_DB:
+        return None
+    floor = float(np.percentile(frame_levels(segment), NOISE_PERCENTILE))
+    return floor + SPEECH_SNR_DB
 
-        # 5️⃣  Success cue
-        status.success("✅ Recording saved")
-        return filename
+def trim_silence(segment: AudioSegment,
+                 silence_db: float | None = None,
+                 pad_ms: int = SPEECH_PAD_MS) -> tuple[AudioSegment | None, int]:
+    """
+    Cut leading/trailing silence (quieter than `silence_db`, by default
+    measured against the clip's own noise floor). Returns (trimmed
+    segment, ms removed); the segment is None when the clip holds no
+    speech at all.
+    """
+    from pydub.silence import detect_nonsilent
+    if silence_db is None:
+        silence_db = silence_threshold(segment)
+        if silence_db is None:
+            return None, len(segment)
+    spans = detect_nonsilent(segment, min_silence_len=100,
+                             silence_thresh=silence_db, seek_step=10)
+    spans = [(s, e) for s, e in spans if e - s >= MIN_SPEECH_MS]
+    if not spans:
+        return None, len(segment)
+    start = max(0, spans[0][0] - pad_ms)
+    end   = min(len(segment), spans[-1][1] + pad_ms)
+    return segment[start:end], len(segment) - (end - start)
 
+def to_float32(segment: AudioSegment) -> np.ndarray:
+    """AudioSegment → 16 kHz mono float32 in [-1, 1], as Whisper wants it."""
+    seg = segment.set_channels(1).set_frame_rate(SAMPLE_RATE).set_sample_width(2)
+    return np.frombuffer(seg.raw_data, dtype=np.int16).astype(np.float32) / 32768.0
+
+def split_chunks(samples: np.ndarray,
+                 chunk_s: float = CHUNK_S,
+                 overlap_s: float = OVERLAP_S) -> list[np.ndarray]:
+    """Overlapping windows over `samples` (views, not copies)."""
+    size = int(chunk_s * SAMPLE_RATE)
+    step = size - int(overlap_s * SAMPLE_RATE)
+    if len(samples) <= size:
+        return [samples]
+    return [samples[i:i + size] for i in range(0, len(samples) - int(overlap_s * SAMPLE_RATE), step)]
+
+def _recorder(key: str, start_label: str, stop_label: str):
+    from audiorecorder import audiorecorder
+    status = st.empty()
+    wav_data = audiorecorder(start_label, stop_label, key=key)
+    if not wav_data:
+        status.info("Click ▶️ Record, then ⏹️ Stop when done.")
+        return status, None
+    return status, wav_data
+
+def record_clip(key: str,
+                start_label: str = "▶️ Record",
+                stop_label : str = "⏹️ Stop") -> Clip | None:
+    """
+    Shows an in-browser recorder and returns the answer as an in-memory
+    `Clip` (or None). Nothing touches disk on the critical path; with
+    REMINDFUL_ARCHIVE_AUDIO=1 a compressed copy goes to the audio archive
+    in the background.
+    """
+    status, wav_data = _recorder(key, start_label, stop_label)
+    if wav_data is None:
+        return None
+
+    digest = clip_digest(key, wav_data)
+    clips  = st.session_state.setdefault("_clips", {})
+    hit    = clips.get(key)
+    if hit and hit.digest == digest:
+        status.success("✅ Recording ready")
+        return hit
+    if digest in st.session_state.setdefault("_silent_clips", set()):
+        status.warning("🔇 We didn’t hear anything—please try recording again.")
+        return None
+
+    try:
+        with metrics.span("record_decode"):
+            segment = to_segment(wav_data)
+            speech, trimmed_ms = trim_silence(segment)
+        metrics.inc("recordings", silent=speech is None)
+        if speech is None:
+            st.session_state["_silent_clips"].add(digest)
+            status.warning("🔇 We didn’t hear anything—please try recording again.")
+            return None
+        clip = Clip(key, digest, to_float32(speech), trimmed_ms=trimmed_ms)
+        if ARCHIVE_AUDIO:
+            archived, clip.path, _ = shared_archive().submit(segment)
+            # kept on the SessionState so they survive a resume
+            state = st.session_state["state"]
+            state.audio_paths[key] = str(clip.path)
+            state.audio_clips[key] = archived
+        clips[key] = clip
+        status.success("✅ Recording ready"
+                       + (f" (trimmed {trimmed_ms / 1000:.1f} s of silence)" if trimmed_ms >= 500 else ""))
+        return clip
     except Exception as e:
-        status.error(f"❌ Couldn’t save recording: {e}")
+        status.error(f"❌ Couldn’t read recording: {e}")
         return None
+
+def forget_clips(keep: str | None = None):
+    """Release decoded audio for every key except `keep`."""
+    clips = st.session_state.get("_clips", {})
+    for key in [k for k in clips if k != keep]:
+        del clips[key]
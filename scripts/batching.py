@@ -0,0 +1,63 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+
+class MicroBatcher:
+    """
+    Collects items submitted from many threads/sessions within a short
+    window and hands them to `fn` as one list, so the model runs one
+    batched pass instead of many batch-size-1 passes.
+
+    `fn(items) -> results` must return one result per item, in order.
+    `key(item)` groups items that can share a pass (e.g. same options);
+    items with different keys in the same window run as separate batches.
+    """
+
+    def __init__(self, fn, window_ms: float = 50, max_batch: int = 16,
+                 key=None, name: str = "batcher"):
+        self.fn        = fn
+        self.window    = window_ms / 1000
+        self.max_batch = max_batch
+        self.key       = key or (lambda item: None)
+        self._queue    = queue.Queue()
+        threading.Thread(target=self._run, name=name, daemon=True).start()
+
+    def submit(self, item) -> Future:
+        fut = Future()
+        self._queue.put((item, fut))
+        return fut
+
+    def pending(self) -> int:
+        """Items waiting for the next batch."""
+        return self._queue.qsize()
+
+    def _take_batch(self) -> list:
+        batch    = [self._queue.get()]
+        deadline = time.perf_counter() + self.window
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            groups = {}
+            for item, fut in self._take_batch():
+                if fut.set_running_or_notify_cancel():
+                    groups.setdefault(self.key(item), []).append((item, fut))
+            for group in groups.values():
+                try:
+                    results = self.fn([item for item, _ in group])
+                except Exception as e:
+                    for _, fut in group:
+                        fut.set_exception(e)
+                    continue
+                for (_, fut), result in zip(group, results):
+                    fut.set_result(result)
@@ -0,0 +1,300 @@
+"""
+Offline benchmarks for the per-answer hot paths.
+
+Every stage runs on its own, on synthetic data, with no network:
+
+  synth     build speech-like clips from text (lengths × amounts of silence)
+  decode    recorder WAV bytes → trimmed 16 kHz float32 (audio_handler)
+  stt-stub  transcription through the stub backend + vocabulary snapping
+  stt       real backends (--real whisper faster-whisper), model load excluded
+  scoring   score_responses / score_session / score_sessions / chunk_dict / …
+  history   save, lookup and scan at 10 / 10k / 100k sessions
+
+    python -m scripts.bench                          # run, compare with the baseline
+    python -m scripts.bench --save-baseline          # run and store as the new baseline
+    python -m scripts.bench --stages scoring history --sizes 10 10000
+
+Results are medians/p95 per operation in ms. Anything slower than the
+baseline by more than --tolerance is flagged and the exit code is 1.
+"""
+import argparse
+import io
+import json
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+import wave
+from pathlib import Path
+import numpy as np
+
+BASE_DIR  = Path(__file__).resolve().parent.parent
+TESTS_DIR = BASE_DIR / "tests"
+BASELINE  = BASE_DIR / "benchmarks" / "baseline.json"
+
+SAMPLE_RATE  = 16_000
+CLIP_SECONDS = (1, 5, 30)
+SILENCE      = (0.0, 0.5)          # share of each clip that is leading/trailing silence
+HISTORY_SIZES = (10, 10_000, 100_000)
+STAGES = ("synth", "decode", "stt-stub", "stt", "scoring", "history")
+
+
+# — SYNTHETIC AUDIO —————————————————————————————————————
+def synth_speech(text: str, seconds: float, silence: float = 0.0, seed: int = 0) -> np.ndarray:
+    """
+    A deterministic, speech-shaped stand-in for `text`: one voiced burst
+    per word (pitch and formants derived from its letters), short gaps
+    between words, padded with low-level noise so `silence` of the clip
+    is quiet. Float32 mono at 16 kHz, exactly `seconds` long.
+    """
+    rng   = np.random.default_rng(seed)
+    total = int(seconds * SAMPLE_RATE)
+    quiet = int(total * silence)
+    voiced_len = total - quiet
+    words = text.split() or ["…"]
+    # repeat the words until they fill the voiced part
+    per_word = max(int(0.35 * SAMPLE_RATE), 1)
+    gap      = int(0.12 * SAMPLE_RATE)
+    bursts = []
+    i = 0
+    while sum(len(b) for b in bursts) < voiced_len:
+        w  = words[i % len(words)]
+        f0 = 100 + (sum(map(ord, w)) % 120)                  # pitch, Hz
+        f1 = 300 + (ord(w[0]) % 40) * 15                     # first formant
+        t  = np.arange(per_word) / SAMPLE_RATE
+        env = np.sin(np.pi * np.arange(per_word) / per_word) ** 2
+        burst = env * (0.5 * np.sin(2 * np.pi * f0 * t) + 0.3 * np.sin(2 * np.pi * f1 * t))
+        bursts += [burst, np.zeros(gap)]
+        i += 1
+    voiced = np.concatenate(bursts)[:voiced_len]
+    lead   = quiet // 2
+    out    = rng.normal(0, 1e-4, total)                       # ~ -80 dBFS floor
+    out[lead:lead + voiced_len] += voiced
+    return out.astype(np.float32)
+
+
+def to_wav_bytes(samples: np.ndarray) -> bytes:
+    """What the browser recorder hands back: 16-bit PCM WAV."""
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(SAMPLE_RATE)
+        w.writeframes((np.clip(samples, -1, 1) * 32767).astype(np.int16).tobytes())
+    return buf.getvalue()
+
+
+def clip_set(words: list[str]) -> list[dict]:
+    """One clip per (length, silence) pair, each 'saying' part of the word list."""
+    clips = []
+    for n, (secs, silence) in enumerate((s, q) for s in CLIP_SECONDS for q in SILENCE):
+        text = " ".join(words[:max(1, int(secs))])
+        clips.append({"name": f"{secs}s-{int(silence * 100)}%silent", "text": text,
+                      "samples": synth_speech(text, secs, silence, seed=n)})
+    return clips
+
+
+# — TIMING ——————————————————————————————————————————————
+def timeit(fn, repeat: int = 20, warmup: int = 1) -> dict:
+    """Per-call wall time of `fn()` (ms): median, p95, min."""
+    for _ in range(warmup):
+        fn()
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - t0) * 1000)
+    times.sort()
+    return {"n": repeat, "median_ms": statistics.median(times),
+            "p95_ms": times[min(len(times) - 1, int(0.95 * len(times)))],
+            "min_ms": times[0]}
+
+
+def load_words() -> dict:
+    return json.loads(sorted(TESTS_DIR.glob("*.json"))[0].read_text())
+
+
+# — STAGES ——————————————————————————————————————————————
+def bench_synth(ctx) -> dict:
+    words = list(ctx["words"].values())
+    return {f"synth.{secs}s": timeit(lambda s=secs: synth_speech(" ".join(words), s, 0.5), 5)
+            for secs in CLIP_SECONDS}
+
+
+def bench_decode(ctx) -> dict:
+    from scripts.audio_handler import to_float32, to_segment, trim_silence
+    out = {}
+    for clip in ctx["clips"]:
+        raw = to_wav_bytes(clip["samples"])
+        def run(raw=raw):
+            speech, _ = trim_silence(to_segment(raw))
+            return to_float32(speech) if speech is not None else None
+        out[f"decode.{clip['name']}"] = timeit(run, 10)
+    return out
+
+
+def bench_stt_stub(ctx) -> dict:
+    from scripts.stt_backends import StubBackend, get_backend
+    from scripts.tts_stt import snap_to_vocabulary
+    backend = get_backend("stub")
+    vocab   = list(ctx["words"].values())
+    out = {}
+    for clip in ctx["clips"]:
+        StubBackend.register(clip["samples"], clip["text"])
+        def run(audio=clip["samples"]):
+            return snap_to_vocabulary(backend.transcribe(audio).text, vocab)
+        out[f"stt-stub.{clip['name']}"] = timeit(run, 50)
+    return out
+
+
+def bench_stt(ctx) -> dict:
+    from scripts.stt_backends import get_backend
+    out = {}
+    for name in ctx["real"]:
+        backend = get_backend(name)
+        t0 = time.perf_counter()
+        backend.transcribe(ctx["clips"][0]["samples"])          # loads the model
+        out[f"stt-{name}.load"] = {"n": 1, "median_ms": (time.perf_counter() - t0) * 1000}
+        for clip in ctx["clips"]:
+            out[f"stt-{name}.{clip['name']}"] = timeit(
+                lambda a=clip["samples"]: backend.transcribe(a), 3, warmup=0)
+    return out
+
+
+def _fake_session(words: dict, rng: random.Random):
+    """Plausible answers: most right, some misspelt, some blank."""
+    def answer(w):
+        r = rng.random()
+        return w if r < 0.6 else (w[:-1] + "x" if r < 0.85 else "")
+    immediate = {c: answer(w) for c, w in words.items()}
+    free      = [answer(w) for w in words.values() if rng.random() < 0.6]
+    cued      = {c: answer(w) for c, w in words.items() if rng.random() < 0.5}
+    return immediate, free, cued
+
+
+def bench_scoring(ctx) -> dict:
+    from scripts.helpers import chunk_dict, merge_transcripts
+    from scripts.scoring import free_recall_hits, score_responses, score_session, score_sessions
+    words = ctx["words"]
+    rng   = random.Random(0)
+    one   = _fake_session(words, rng)
+    many  = [_fake_session(words, rng) for _ in range(1000)]
+    parts = [" ".join(words.values())] * 4
+    return {
+        "scoring.score_responses":     timeit(lambda: score_responses(words, one[0]), 200),
+        "scoring.score_session":       timeit(lambda: score_session(words, *one), 200),
+        "scoring.score_sessions_1000": timeit(lambda: score_sessions(words, many), 5),
+        "scoring.free_recall_hits":    timeit(lambda: free_recall_hits(words, one[1]), 200),
+        "scoring.chunk_dict":          timeit(lambda: chunk_dict(words, 4), 1000),
+        "scoring.merge_transcripts":   timeit(lambda: merge_transcripts(parts), 200),
+    }
+
+
+def bench_history(ctx) -> dict:
+    from scripts.history_store import HistoryStore, now
+    words = ctx["words"]
+    rng   = random.Random(0)
+    out   = {}
+    for size in ctx["sizes"]:
+        with tempfile.TemporaryDirectory() as tmp:
+            store = HistoryStore(Path(tmp) / "history.db")
+            users = max(1, size // 4)
+            t0 = time.perf_counter()
+            for i in range(size):
+                immediate, free, cued = _fake_session(words, rng)
+                store.save_session(
+                    f"s{i}", f"user{i % users}", "version1",
+                    demographics={"age": 20 + i % 60, "worry": "A little worried"},
+                    responses={"immediate": immediate, "free": free, "cued": cued},
+                    scores={"total": 30}, timings={}, started_at=now(), completed_at=now())
+            save_ms = (time.perf_counter() - t0) * 1000
+            out[f"history.{size}.save"] = {"n": size, "median_ms": save_ms / size,
+                                           "total_ms": save_ms}
+            out[f"history.{size}.completed_count"] = timeit(
+                lambda: store.completed_count(f"user{rng.randrange(users)}"), 200)
+            out[f"history.{size}.get_session"] = timeit(
+                lambda: store.get_session(f"s{rng.randrange(size)}"), 200)
+            t0 = time.perf_counter()
+            scanned = sum(1 for _ in store.iter_sessions(batch_size=1000))
+            out[f"history.{size}.scan"] = {"n": scanned,
+                                           "median_ms": (time.perf_counter() - t0) * 1000}
+    return out
+
+
+RUNNERS = {"synth": bench_synth, "decode": bench_decode, "stt-stub": bench_stt_stub,
+           "stt": bench_stt, "scoring": bench_scoring, "history": bench_history}
+
+
+# — DRIVER ——————————————————————————————————————————————
+def run(stages=STAGES, sizes=HISTORY_SIZES, real=()) -> dict:
+    words = load_words()
+    ctx = {"words": words, "sizes": sizes, "real": real,
+           "clips": clip_set([w for w in words.values()])}
+    results, skipped = {}, {}
+    for stage in stages:
+        if stage == "stt" and not real:
+            continue
+        try:
+            results.update(RUNNERS[stage](ctx))
+        except ImportError as e:
+            skipped[stage] = f"missing dependency: {e.name}"
+        print(f"  {stage:<9} done", file=sys.stderr)
+    return {"meta": {"python": platform.python_version(), "machine": platform.machine(),
+                     "platform": platform.platform(), "date": time.strftime("%Y-%m-%d %H:%M")},
+            "results": results, "skipped": skipped}
+
+
+def compare(current: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Print current vs baseline medians; returns the names that regressed."""
+    regressed = []
+    print(f"{'benchmark':<40}{'median ms':>12}{'baseline':>12}{'ratio':>8}")
+    for name, r in current["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if base and base["median_ms"] > 0:
+            ratio = r["median_ms"] / base["median_ms"]
+            flag  = "  ← slower" if ratio > 1 + tolerance else ""
+            if flag:
+                regressed.append(name)
+            print(f"{name:<40}{r['median_ms']:>12.3f}{base['median_ms']:>12.3f}{ratio:>8.2f}{flag}")
+        else:
+            print(f"{name:<40}{r['median_ms']:>12.3f}{'—':>12}")
+    for stage, why in current["skipped"].items():
+        print(f"{stage:<40}skipped ({why})")
+    return regressed
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Offline benchmarks for the assessment hot paths")
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=list(STAGES))
+    parser.add_argument("--sizes", nargs="+", type=int, default=list(HISTORY_SIZES),
+                        help="history sizes (sessions) to benchmark")
+    parser.add_argument("--real", nargs="*", default=[],
+                        help="real STT backends to time, e.g. whisper faster-whisper")
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--out", type=Path, help="also write this run's results here")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed slowdown vs the baseline (0.25 = 25%%)")
+    args = parser.parse_args(argv)
+
+    current = run(args.stages, args.sizes, args.real)
+    baseline = json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+    regressed = compare(current, baseline, args.tolerance)
+
+    if args.out:
+        args.out.write_text(json.dumps(current, indent=2))
+    if args.save_baseline:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps(current, indent=2))
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+    if regressed:
+        print(f"{len(regressed)} benchmark(s) more than {args.tolerance:.0%} slower than the baseline")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
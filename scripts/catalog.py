@@ -0,0 +1,72 @@
+import json
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+from scripts.helpers import chunk_dict
+from scripts.phonetic import MatchIndex, match_index
+
+SHEET_SIZE = 4
+
+
+@dataclass(frozen=True)
+class TestVersion:
+    """One word list from tests/*.json, with everything derived from it precomputed."""
+    name: str
+    words: dict                                   # {cue: word}
+    sheets: list = field(default_factory=list)    # chunk_dict(words, SHEET_SIZE)
+    cue_index: dict = field(default_factory=dict)     # cue -> position in `words`
+    index: MatchIndex = field(default_factory=MatchIndex)  # spoken-answer lookup
+
+    @classmethod
+    def from_words(cls, name: str, words: dict) -> "TestVersion":
+        return cls(
+            name=name,
+            words=words,
+            sheets=chunk_dict(words, SHEET_SIZE),
+            cue_index={cue: i for i, cue in enumerate(words)},
+            index=match_index(words),
+        )
+
+
+class VersionCatalog:
+    """All test versions, in order, with O(1) lookup by name and by position."""
+
+    def __init__(self, versions: list[TestVersion]):
+        if not versions:
+            raise ValueError("no test versions found")
+        self.versions = versions
+        self.by_name  = {v.name: v for v in versions}
+
+    def __getitem__(self, name: str) -> TestVersion:
+        return self.by_name[name]
+
+    def __len__(self) -> int:
+        return len(self.versions)
+
+    def get(self, name: str | None, default=None) -> TestVersion | None:
+        return self.by_name.get(name, default)
+
+    @property
+    def default(self) -> TestVersion:
+        return self.versions[0]
+
+    def next_for(self, completed: int) -> TestVersion:
+        """The version a user who has finished `completed` tests takes next."""
+        return self.versions[completed % len(self.versions)]
+
+
+def fingerprint(tests_dir) -> tuple:
+    """Cheap change detector for a tests directory (names, mtimes, sizes)."""
+    with os.scandir(tests_dir) as it:
+        return tuple(sorted(
+            (e.name, e.stat().st_mtime_ns, e.stat().st_size)
+            for e in it if e.name.endswith(".json") and e.is_file()
+        ))
+
+
+def build_catalog(tests_dir) -> VersionCatalog:
+    tests_dir = Path(tests_dir)
+    return VersionCatalog([
+        TestVersion.from_words(p.stem, json.loads(p.read_text()))
+        for p in sorted(tests_dir.glob("*.json"))
+    ])
@@ -0,0 +1,200 @@
+"""
+Results export: one session for the participant, or every stored session
+for the research pipeline, as JSON, CSV or Parquet.
+
+    python -m scripts.export --out exports/ --format parquet
+    python -m scripts.export --format csv --batch-size 2000
+
+A bulk export writes two tables, sessions (one row per session) and items
+(one row per cue), streaming them in batches so memory stays flat however
+big the history is. JSON bulk exports are JSON Lines.
+"""
+import argparse
+import csv
+import io
+import json
+import sys
+from pathlib import Path
+from scripts.catalog import build_catalog
+from scripts.history_store import HistoryStore
+from scripts.scoring import MATCH_THRESHOLD, SCORING_VERSION, SessionScore, score_sessions
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+FORMATS  = ("json", "csv", "parquet")
+
+SESSION_COLUMNS = ["session_id", "user_id", "version", "completed_at",
+                   "immediate", "free", "cued", "intrusions", "total",
+                   "scoring_version", "threshold"]
+DETAIL_COLUMNS  = ["started_at", "age", "worry", "use_audio", "interference_hits", "timings"]
+ITEM_COLUMNS    = ["session_id", "version", "cue", "expected",
+                   "immediate", "immediate_similarity", "immediate_match",
+                   "free_similarity", "free_match",
+                   "cued", "cued_similarity", "cued_match"]
+
+
+# — ROWS ————————————————————————————————————————————————
+def session_row(session: dict, score: SessionScore, threshold: float) -> list:
+    return [session["session_id"], session["user_id"], session["version"],
+            session.get("completed_at"), *score.totals().values(), SCORING_VERSION, threshold]
+
+def detail_row(session: dict) -> list:
+    demo = session.get("demographics", {})
+    interference = session.get("responses", {}).get("interference") or {}
+    return [session.get("started_at"), demo.get("age"), demo.get("worry"),
+            demo.get("use_audio"), interference.get("hits"),
+            json.dumps(session.get("timings", {}))]
+
+def item_rows(session: dict, score: SessionScore) -> list[list]:
+    return [[session["session_id"], session["version"], cue, *d.values()]
+            for cue, d in score.details.items()]
+
+def score_batch(catalog, sessions: list[dict], threshold: float = MATCH_THRESHOLD):
+    """(session, score) for each session whose word list still exists."""
+    by_version = {}
+    for s in sessions:
+        by_version.setdefault(s["version"], []).append(s)
+    for name, group in by_version.items():
+        version = catalog.get(name)
+        if version is None:
+            continue
+        inputs = [(s["responses"].get("immediate", {}), s["responses"].get("free", []),
+                   s["responses"].get("cued", {})) for s in group]
+        yield from zip(group, score_sessions(version.words, inputs, threshold))
+
+
+# — ONE SESSION —————————————————————————————————————————
+def session_document(session: dict, score: SessionScore,
+                     threshold: float = MATCH_THRESHOLD) -> dict:
+    """Everything about one session as a nested, machine-readable record."""
+    return {
+        "session_id": session["session_id"],
+        "version": session["version"],
+        "started_at": session.get("started_at"),
+        "completed_at": session.get("completed_at"),
+        "scoring_version": SCORING_VERSION,
+        "threshold": threshold,
+        "demographics": session.get("demographics", {}),
+        "scores": score.totals(),
+        "missed_in_free_recall": score.missed,
+        "items": [{"cue": cue, **d} for cue, d in score.details.items()],
+        "interference": session.get("responses", {}).get("interference"),
+        "timings": session.get("timings", {}),
+    }
+
+def export_session(session: dict, score: SessionScore, fmt: str = "json",
+                   threshold: float = MATCH_THRESHOLD) -> tuple[bytes, str, str]:
+    """
+    One session as a file: (data, MIME type, extension). JSON is the
+    nested document; CSV and Parquet are one row per cue with the
+    session's totals repeated on each row.
+    """
+    if fmt == "json":
+        doc = session_document(session, score, threshold)
+        return json.dumps(doc, indent=2, ensure_ascii=False).encode(), "application/json", "json"
+
+    # session totals are prefixed so they don't clash with the per-item answers
+    totals  = set(score.totals())
+    columns = ([f"score_{c}" if c in totals else c for c in SESSION_COLUMNS]
+               + DETAIL_COLUMNS + ITEM_COLUMNS[2:])
+    head = session_row(session, score, threshold) + detail_row(session)
+    rows = [head + item[2:] for item in item_rows(session, score)]
+    if fmt == "csv":
+        buf = io.StringIO()
+        w = csv.writer(buf)
+        w.writerow(columns)
+        w.writerows(rows)
+        return buf.getvalue().encode(), "text/csv", "csv"
+    if fmt == "parquet":
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        buf = io.BytesIO()
+        pq.write_table(pa.Table.from_pylist([dict(zip(columns, r)) for r in rows]), buf)
+        return buf.getvalue(), "application/vnd.apache.parquet", "parquet"
+    raise ValueError(f"unknown export format {fmt!r}")
+
+
+# — BULK ————————————————————————————————————————————————
+class TableWriter:
+    """
+    Appends row batches to <name>.csv or <name>.jsonl, or to numbered
+    <name>-NNNNN.parquet parts — one part per batch, so nothing is held
+    in memory between batches.
+    """
+
+    def __init__(self, out_dir: Path, name: str, columns: list, fmt: str):
+        self.out_dir, self.name, self.columns, self.fmt = out_dir, name, columns, fmt
+        self.parts = len(list(out_dir.glob(f"{name}-*.parquet")))
+
+    def write(self, rows: list):
+        if not rows:
+            return
+        if self.fmt == "csv":
+            path = self.out_dir / f"{self.name}.csv"
+            new  = not path.exists()
+            with path.open("a", newline="") as f:
+                w = csv.writer(f)
+                if new:
+                    w.writerow(self.columns)
+                w.writerows(rows)
+        elif self.fmt == "json":
+            with (self.out_dir / f"{self.name}.jsonl").open("a") as f:
+                f.writelines(json.dumps(dict(zip(self.columns, r)), ensure_ascii=False) + "\n"
+                             for r in rows)
+        else:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            table = pa.Table.from_pylist([dict(zip(self.columns, r)) for r in rows])
+            pq.write_table(table, self.out_dir / f"{self.name}-{self.parts:05d}.parquet")
+            self.parts += 1
+
+
+def export_all(store: HistoryStore, tests_dir: Path, out_dir: Path, fmt: str = "csv",
+               batch_size: int = 1000, threshold: float = MATCH_THRESHOLD) -> int:
+    """Stream every completed session into sessions/items tables. Returns sessions written."""
+    if fmt not in FORMATS:
+        raise ValueError(f"unknown export format {fmt!r}")
+    out_dir.mkdir(parents=True, exist_ok=True)
+    for old in [*out_dir.glob("sessions*"), *out_dir.glob("items*")]:
+        old.unlink()
+    catalog  = build_catalog(tests_dir)
+    sessions = TableWriter(out_dir, "sessions", SESSION_COLUMNS + DETAIL_COLUMNS, fmt)
+    items    = TableWriter(out_dir, "items", ITEM_COLUMNS, fmt)
+
+    written, batch = 0, []
+    def flush():
+        nonlocal written
+        session_rows, rows = [], []
+        for s, score in score_batch(catalog, batch, threshold):
+            session_rows.append(session_row(s, score, threshold) + detail_row(s))
+            rows += item_rows(s, score)
+        sessions.write(session_rows)
+        items.write(rows)
+        written += len(session_rows)
+        batch.clear()
+        print(f"\rexported {written:,} sessions", end="", file=sys.stderr, flush=True)
+
+    for s in store.iter_sessions(batch_size=batch_size, completed_only=True):
+        batch.append(s)
+        if len(batch) >= batch_size:
+            flush()
+    flush()
+    print(file=sys.stderr)
+    return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export stored sessions for analysis")
+    parser.add_argument("--db", type=Path, default=BASE_DIR.parent / "data" / "history.db")
+    parser.add_argument("--tests", type=Path, default=BASE_DIR / "tests")
+    parser.add_argument("--out", type=Path, default=Path("exports"))
+    parser.add_argument("--format", choices=FORMATS, default="csv")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--threshold", type=float, default=MATCH_THRESHOLD)
+    args = parser.parse_args(argv)
+    n = export_all(HistoryStore(args.db), args.tests, args.out, args.format,
+                   args.batch_size, args.threshold)
+    print(f"Exported {n:,} sessions to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,3 +2,22 @@ def chunk_dict(d: dict, size: int) -> list[dict]:
     """Break a dict into a list of dicts of length `size`."""
     items = list(d.items())
     return [dict(items[i:i+size]) for i in range(0, len(items), size)]
+
+
+def merge_transcripts(parts: list[str], max_overlap: int = 8) -> str:
+    """
+    Join chunk transcripts, dropping words repeated where chunks overlap
+    (the longest tail/head match of up to `max_overlap` words).
+    """
+    def norm(ws):
+        return [w.strip(".,!?;:").lower() for w in ws]
+
+    words = []
+    for part in parts:
+        new  = part.split()
+        tail = norm(words[-max_overlap:])
+        head = norm(new[:max_overlap])
+        k = next((k for k in range(min(len(tail), len(head)), 0, -1)
+                  if tail[-k:] == head[:k]), 0)
+        words.extend(new[k:])
+    return " ".join(words)
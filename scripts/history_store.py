@@ -0,0 +1,242 @@
+import json
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id   TEXT PRIMARY KEY,
+    user_id      TEXT NOT NULL,
+    version      TEXT NOT NULL,
+    started_at   TEXT,
+    completed_at TEXT,
+    demographics TEXT NOT NULL DEFAULT '{}',
+    responses    TEXT NOT NULL DEFAULT '{}',
+    scores       TEXT NOT NULL DEFAULT '{}',
+    timings      TEXT NOT NULL DEFAULT '{}'
+);
+CREATE INDEX IF NOT EXISTS idx_sessions_user_version ON sessions (user_id, version);
+CREATE INDEX IF NOT EXISTS idx_sessions_version      ON sessions (version);
+CREATE TABLE IF NOT EXISTS user_progress (
+    user_id   TEXT PRIMARY KEY,
+    completed INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS checkpoints (
+    session_id TEXT PRIMARY KEY,
+    user_id    TEXT NOT NULL,
+    saved_at   TEXT NOT NULL,
+    state      TEXT NOT NULL          -- SessionState.dumps()
+);
+CREATE INDEX IF NOT EXISTS idx_checkpoints_saved ON checkpoints (saved_at);
+"""
+
+_JSON_FIELDS = ("demographics", "responses", "scores", "timings")
+
+
+def _row_to_session(row: sqlite3.Row) -> dict:
+    session = dict(row)
+    for field in _JSON_FIELDS:
+        session[field] = json.loads(session[field])
+    return session
+
+
+class HistoryStore:
+    """
+    Participant history in SQLite (WAL mode): indexed by user and test
+    version, one atomic upsert per session, safe for concurrent sessions.
+    Each thread gets its own connection.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        with self._conn() as conn:
+            conn.executescript(SCHEMA)
+            if not conn.execute("SELECT 1 FROM user_progress LIMIT 1").fetchone():
+                self._rebuild_progress(conn)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def connection(self) -> sqlite3.Connection:
+        """This thread's connection, for modules that keep their own tables here."""
+        return self._conn()
+
+    @staticmethod
+    def _rebuild_progress(conn: sqlite3.Connection):
+        conn.execute("DELETE FROM user_progress")
+        conn.execute(
+            """
+            INSERT INTO user_progress (user_id, completed)
+            SELECT user_id, COUNT(*) FROM sessions
+            WHERE completed_at IS NOT NULL GROUP BY user_id
+            """
+        )
+
+    # — WRITES ——————————————————————————————————————————
+    def save_session(self, session_id: str, user_id: str, version: str, *,
+                     demographics: dict | None = None, responses: dict | None = None,
+                     scores: dict | None = None, timings: dict | None = None,
+                     started_at: str | None = None, completed_at: str | None = None):
+        """
+        Insert or replace one session in a single transaction. The first
+        save with `completed_at` set also bumps the user's completed count.
+        """
+        row = (session_id, user_id, version, started_at, completed_at,
+               json.dumps(demographics or {}), json.dumps(responses or {}),
+               json.dumps(scores or {}), json.dumps(timings or {}))
+        with self._conn() as conn:
+            prev = conn.execute("SELECT completed_at FROM sessions WHERE session_id = ?",
+                                (session_id,)).fetchone()
+            conn.execute(
+                """
+                INSERT INTO sessions (session_id, user_id, version, started_at, completed_at,
+                                      demographics, responses, scores, timings)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (session_id) DO UPDATE SET
+                    user_id = excluded.user_id, version = excluded.version,
+                    started_at = excluded.started_at, completed_at = excluded.completed_at,
+                    demographics = excluded.demographics, responses = excluded.responses,
+                    scores = excluded.scores, timings = excluded.timings
+                """,
+                row,
+            )
+            if completed_at and not (prev and prev[0]):
+                conn.execute(
+                    """
+                    INSERT INTO user_progress (user_id, completed) VALUES (?, 1)
+                    ON CONFLICT (user_id) DO UPDATE SET completed = completed + 1
+                    """,
+                    (user_id,),
+                )
+            if completed_at:
+                conn.execute("DELETE FROM checkpoints WHERE session_id = ?", (session_id,))
+
+    def save_checkpoint(self, session_id: str, user_id: str, state: str):
+        """Keep the latest in-progress state of a session so it can be resumed."""
+        with self._conn() as conn:
+            conn.execute(
+                """
+                INSERT INTO checkpoints (session_id, user_id, saved_at, state)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT (session_id) DO UPDATE SET
+                    user_id = excluded.user_id, saved_at = excluded.saved_at,
+                    state = excluded.state
+                """,
+                (session_id, user_id, now(), state),
+            )
+
+    def expire_checkpoints(self, max_age_days: float) -> int:
+        """Forget unfinished sessions not touched in `max_age_days`. Returns rows removed."""
+        cutoff = (datetime.now() - timedelta(days=max_age_days)).isoformat(timespec="seconds")
+        with self._conn() as conn:
+            return conn.execute("DELETE FROM checkpoints WHERE saved_at < ?", (cutoff,)).rowcount
+
+    # — READS ———————————————————————————————————————————
+    def get_session(self, session_id: str) -> dict | None:
+        row = self._conn().execute(
+            "SELECT * FROM sessions WHERE session_id = ?", (session_id,)).fetchone()
+        return _row_to_session(row) if row else None
+
+    def sessions_for(self, user_id: str, version: str | None = None) -> list[dict]:
+        """A user's sessions (optionally for one version), oldest first."""
+        if version is None:
+            rows = self._conn().execute(
+                "SELECT * FROM sessions WHERE user_id = ? ORDER BY started_at", (user_id,))
+        else:
+            rows = self._conn().execute(
+                "SELECT * FROM sessions WHERE user_id = ? AND version = ? ORDER BY started_at",
+                (user_id, version))
+        return [_row_to_session(r) for r in rows]
+
+    def iter_sessions(self, batch_size: int = 1000, completed_only: bool = False):
+        """Stream every session without loading the table into memory."""
+        sql = "SELECT * FROM sessions"
+        if completed_only:
+            sql += " WHERE completed_at IS NOT NULL"
+        cur = self._conn().execute(sql + " ORDER BY rowid")
+        while True:
+            rows = cur.fetchmany(batch_size)
+            if not rows:
+                return
+            for row in rows:
+                yield _row_to_session(row)
+
+    def completed_count(self, user_id: str) -> int:
+        """How many tests `user_id` has finished (primary-key lookup)."""
+        row = self._conn().execute(
+            "SELECT completed FROM user_progress WHERE user_id = ?", (user_id,)).fetchone()
+        return row[0] if row else 0
+
+    def get_checkpoint(self, session_id: str) -> str | None:
+        """The saved state of an unfinished session, if any."""
+        row = self._conn().execute(
+            "SELECT state FROM checkpoints WHERE session_id = ?", (session_id,)).fetchone()
+        return row[0] if row else None
+
+    def count(self, completed_only: bool = False) -> int:
+        sql = "SELECT COUNT(*) FROM sessions"
+        if completed_only:
+            sql += " WHERE completed_at IS NOT NULL"
+        return self._conn().execute(sql).fetchone()[0]
+
+    # — MIGRATION ———————————————————————————————————————
+    def migrate_json(self, path) -> int:
+        """
+        Import a legacy history.json ({user: [session, …]}, {user: session}
+        or [session, …]). Safe to re-run: rows already imported are skipped.
+        Returns the number of sessions added.
+        """
+        path = Path(path)
+        try:
+            data = json.loads(path.read_text())
+        except (OSError, json.JSONDecodeError):
+            return 0
+
+        if isinstance(data, list):
+            entries = [(s.get("user_id", "unknown"), s) for s in data if isinstance(s, dict)]
+        else:
+            entries = []
+            for user_id, sessions in data.items():
+                if isinstance(sessions, dict):
+                    sessions = [sessions]
+                entries += [(user_id, s) for s in sessions if isinstance(s, dict)]
+
+        # legacy records carry no reliable timestamps; fall back to the file's
+        stamp = datetime.fromtimestamp(path.stat().st_mtime).isoformat(timespec="seconds")
+        rows = []
+        for i, (user_id, s) in enumerate(entries):
+            rows.append((
+                s.get("session_id") or f"legacy-{user_id}-{i}",
+                str(user_id), str(s.get("version", "unknown")),
+                s.get("started_at") or s.get("date") or stamp,
+                s.get("completed_at") or s.get("date") or stamp,
+                json.dumps(s.get("demographics", {})),
+                json.dumps(s.get("responses", {})),
+                json.dumps(s.get("scores", {k: s[k] for k in
+                                            ("immediate", "free", "cued", "intrusions", "total")
+                                            if k in s})),
+                json.dumps(s.get("timings", {})),
+            ))
+        with self._conn() as conn:
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO sessions VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            added = conn.total_changes - before
+            if added:
+                self._rebuild_progress(conn)
+            return added
+
+
+def now() -> str:
+    """Timestamp format used for started_at / completed_at."""
+    return datetime.now().isoformat(timespec="seconds")
@@ -0,0 +1,97 @@
+"""
+Cold-start import report and budget check.
+
+Imports everything app.py imports in a fresh interpreter under
+`python -X importtime`, prints the most expensive packages, and exits
+non-zero when the total goes over budget or a heavy dependency that
+should load lazily (torch, whisper, pydub, …) was pulled in at startup.
+
+    python -m scripts.import_budget
+    python -m scripts.import_budget --budget-ms 1500 --top 20
+"""
+import argparse
+import ast
+import os
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+BASE_DIR   = Path(__file__).resolve().parent.parent
+APP        = BASE_DIR / "app.py"
+BUDGET_MS  = float(os.environ.get("REMINDFUL_IMPORT_BUDGET_MS", "2000"))
+
+# Only ever needed once someone records or transcribes audio
+LAZY = ("torch", "whisper", "faster_whisper", "ctranslate2",
+        "pydub", "audiorecorder", "pyttsx3", "pandas", "pyarrow")
+
+
+def app_imports(path: Path = APP) -> list[str]:
+    """Module names imported at the top level of `path`, in order."""
+    names = []
+    for node in ast.parse(path.read_text()).body:
+        if isinstance(node, ast.Import):
+            names += [a.name for a in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            # `from scripts import norms` imports a submodule
+            names += [f"{node.module}.{a.name}" if node.module == "scripts" else node.module
+                      for a in node.names]
+    return list(dict.fromkeys(names))
+
+
+def profile(modules: list[str]) -> list[tuple[str, int, int]]:
+    """(module, self µs, cumulative µs) for every import, from a cold interpreter."""
+    code = "\n".join(f"import {m}" for m in modules)
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                          cwd=BASE_DIR, capture_output=True, text=True)
+    if proc.returncode:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cum_us, name = line[len("import time:"):].split("|")
+        rows.append((name.strip(), int(self_us), int(cum_us)))
+    return rows
+
+
+def report(rows, top: int = 15) -> tuple[float, list[str]]:
+    """Print per-package cost; returns (total ms, lazy packages that were loaded)."""
+    by_package = defaultdict(int)
+    for name, self_us, _ in rows:
+        by_package[name.split(".")[0]] += self_us
+    total_ms = sum(by_package.values()) / 1000
+    print(f"{'package':<28}{'ms':>9}{'share':>8}")
+    for pkg, us in sorted(by_package.items(), key=lambda kv: -kv[1])[:top]:
+        print(f"{pkg:<28}{us / 1000:>9.1f}{100 * us / 1000 / total_ms:>7.1f}%")
+    print(f"{'total':<28}{total_ms:>9.1f}   ({len(rows)} modules)")
+    return total_ms, [p for p in LAZY if p in by_package]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Cold-start import report for app.py")
+    parser.add_argument("--budget-ms", type=float, default=BUDGET_MS)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args(argv)
+
+    try:
+        rows = profile(app_imports())
+    except RuntimeError as e:
+        print(f"could not import the app's dependencies: {e}", file=sys.stderr)
+        return 2
+    total_ms, eager = report(rows, args.top)
+
+    failed = False
+    if total_ms > args.budget_ms:
+        print(f"FAIL: cold import took {total_ms:.0f} ms, budget is {args.budget_ms:.0f} ms")
+        failed = True
+    if eager:
+        print(f"FAIL: loaded at startup but should be lazy: {', '.join(eager)}")
+        failed = True
+    if not failed:
+        print(f"OK: within the {args.budget_ms:.0f} ms budget")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,289 @@
+"""
+Headless load test: N simulated participants take the whole test at once,
+each in its own copy of the app. The numbers are per app worker, not for
+one shared `streamlit run` server.
+
+Each participant is a Streamlit AppTest session of app.py that walks
+demographics → instructions → controlled → immediate → interference →
+free_recall → cued_recall → results with typed or spoken answers. AppTest
+installs and tears down process-wide Streamlit state (the runtime
+singleton, config options) on every run, so it is not safe to share a
+process: each participant runs in a fresh worker process, and up to
+`--concurrency` of them run at once. They do not share the model registry,
+transcript cache or STT pool, so contention inside one server (and the
+memory a shared model saves) is not measured: read the latencies as what
+one participant sees on an otherwise idle worker, and peak RSS as the
+cost of one worker.
+
+AppTest can't drive custom components, so:
+  * the browser recorder is replaced by a stand-in that returns the WAV
+    the harness placed in session state for that widget key, and the
+    clip's transcript is scripted on the stub STT backend;
+  * the browser-side interference task is completed by writing its
+    result straight into the session state.
+
+Everything is written to a throwaway history database.
+
+    python -m scripts.loadtest --users 40 --concurrency 10 --audio-share 0.5
+"""
+import argparse
+import json
+import os
+import random
+import resource
+import statistics
+import sys
+import tempfile
+import time
+import types
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from scripts.session_state import Cue
+
+BASE_DIR  = Path(__file__).resolve().parent.parent
+APP       = BASE_DIR / "app.py"
+CLIPS_KEY = "_loadtest_clips"     # session-state slot the fake recorder reads
+
+
+def _install_fake_recorder():
+    """Stand-in for streamlit-audiorecorder: returns the clip queued for `key`."""
+    fake = types.ModuleType("audiorecorder")
+
+    def audiorecorder(start_prompt="", stop_prompt="", pause_prompt="", key=None, **_):
+        import streamlit as st
+        return st.session_state.get(CLIPS_KEY, {}).get(key)
+
+    fake.audiorecorder = audiorecorder
+    sys.modules["audiorecorder"] = fake
+
+
+class Participant:
+    """One scripted walk through the test, timing every rerun by phase."""
+
+    def __init__(self, n: int, audio: bool, accuracy: float, seed: int, timeout: float):
+        from streamlit.testing.v1 import AppTest
+        self.n, self.audio, self.accuracy = n, audio, accuracy
+        self.rng = random.Random(seed)
+        self.at  = AppTest.from_file(str(APP), default_timeout=timeout)
+        self.latency = defaultdict(list)      # phase -> [ms]
+        self.reruns  = 0
+
+    # — plumbing ————————————————————————————————————————
+    @property
+    def state(self):
+        return self.at.session_state["state"]
+
+    def _drop_stale_inputs(self):
+        """
+        A st.rerun() mid-run can leave the previous page's trailing elements
+        in AppTest's tree (a browser drops them). Blank any text box the app
+        no longer has, or AppTest fails reading its state on the next run.
+        """
+        state = self.at.session_state
+        for box in [*self.at.text_input, *self.at.text_area]:
+            if box.key and box.key not in state:
+                box.set_value(None)
+
+    def _run(self, action=None):
+        """Perform `action` (a widget interaction) or a bare rerun, and time it."""
+        self._drop_stale_inputs()
+        phase = self.state.phase.name.lower() if "state" in self.at.session_state else "start"
+        t0 = time.perf_counter()
+        (action or self.at).run()
+        self.latency[phase].append((time.perf_counter() - t0) * 1000)
+        self.reruns += 1
+        if self.at.exception:
+            raise RuntimeError(self.at.exception[0].message)
+
+    def _button(self, label: str | None = None, key: str | None = None):
+        for b in self.at.button:
+            if (key and b.key == key) or (label and b.label == label):
+                return b.click()
+        raise LookupError(f"no button {label or key!r} in phase {self.state.phase.name}")
+
+    def _say(self, key: str, text: str):
+        """Queue a 'recording' of `text` for recorder `key` and script its transcript."""
+        from scripts.audio_handler import to_float32, to_segment, trim_silence
+        from scripts.bench import synth_speech, to_wav_bytes
+        from scripts.stt_backends import StubBackend
+        wav = to_wav_bytes(synth_speech(text or "mm", 1.0 + 0.4 * len(text.split()), 0.3,
+                                        seed=self.rng.randrange(1 << 30)))
+        speech, _ = trim_silence(to_segment(wav))
+        StubBackend.register(to_float32(speech), text)
+        self.at.session_state[CLIPS_KEY] = {**self.at.session_state[CLIPS_KEY], key: wav}
+        self._run()     # the recorder hands the clip over on this rerun
+
+    def _answer(self, word: str) -> str:
+        if self.rng.random() < self.accuracy:
+            return word
+        return self.rng.choice(["", word[:-1], "table", "river"])
+
+    # — the test ————————————————————————————————————————
+    def walk(self, catalog):
+        at = self.at
+        self._run()
+        at.session_state[CLIPS_KEY] = {}
+        at.text_input(key="research_name").input(f"loadtest-{os.getpid()}-{self.n}")
+        at.checkbox[0].set_value(self.audio)
+        self._run(self._button("Begin Test"))
+        self._run(self._button("Start the Test"))
+
+        version = catalog[self.state.version]
+        words, cues = version.words, list(version.words)
+        phase = lambda: self.state.phase.name
+
+        while phase() in ("CONTROLLED", "IMMEDIATE"):
+            s = self.state
+            sheet = list(version.sheets[s.sheet_index])
+            if phase() == "CONTROLLED":
+                # the matching card sits at the cue's own position on the sheet;
+                # a correct click stops rendering the grid, so redraw it after
+                self._run(self._button(key=f"ctrl_{s.sheet_index}_{s.item_index}_{s.item_index}"))
+                self._run()
+                continue
+            pending = [c for c in sheet if not s.has(version.cue_index[c], Cue.IMM_DONE)]
+            if not pending:
+                self._run()
+                continue
+            cue, idx = pending[0], s.sheet_index
+            said = self._answer(words[cue]) or words[cue][0]
+            if self.audio:
+                self._say(f"imm_audio_{idx}_{cue}", said)
+            else:
+                at.text_input(key=f"imm_type_{idx}_{cue}").input(said)
+            self._run(self._button(key=f"imm_next_{idx}_{cue}"))
+
+        # interference: the browser task's result, injected
+        self.state.interference = {"hits": self.rng.randint(3, 8), "false_taps": 0,
+                                   "misses": 1, "shown": 14, "reaction_ms": [650, 720]}
+        self._run()
+        self._run(self._button("Continue to Recall"))
+
+        recalled = [words[c] for c in cues if self.rng.random() < self.accuracy]
+        if self.audio:
+            self._say("free_recall_0", " ".join(recalled))
+        else:
+            at.text_area[0].input(", ".join(recalled))
+        self._run(self._button("Done Free Recall"))
+        self._run()     # the phase changed after the page was drawn
+
+        while phase() == "CUED_RECALL":
+            i = self.state.next_cued()
+            if i is None:
+                self._run()
+                continue
+            cue = cues[i]
+            said = self._answer(words[cue])
+            if self.audio and said:
+                self._say(f"cr_audio_{cue}", said)
+            else:
+                at.text_input(key=f"cr_type_{cue}").input(said)
+            self._run(self._button(key=f"cr_next_{cue}"))
+
+        if phase() != "RESULTS":
+            raise RuntimeError(f"ended in {phase()}")
+
+
+def percentile(xs: list, q: float) -> float:
+    xs = sorted(xs)
+    return xs[min(len(xs) - 1, int(q / 100 * len(xs)))] if xs else float("nan")
+
+
+def _worker_init(env: dict):
+    """Per-process setup: configuration first, then the recorder stand-in."""
+    os.environ.update(env)
+    _install_fake_recorder()
+
+
+def _participant(n: int, audio: bool, accuracy: float, seed: int, timeout: float) -> dict:
+    """One participant in its own worker process; returns its timings."""
+    from scripts.catalog import build_catalog
+    p = Participant(n, audio, accuracy, seed, timeout)
+    p.walk(build_catalog(BASE_DIR / "tests"))
+    return {"latency": dict(p.latency), "reruns": p.reruns}
+
+
+def run(users: int, concurrency: int, audio_share: float, accuracy: float,
+        timeout: float, seed: int = 0, env: dict | None = None) -> dict:
+    rng  = random.Random(seed)
+    plan = [(n, rng.random() < audio_share, accuracy, rng.randrange(1 << 30), timeout)
+            for n in range(users)]
+
+    latency, errors, done, reruns = defaultdict(list), [], 0, 0
+    started = time.perf_counter()
+    with ProcessPoolExecutor(concurrency, initializer=_worker_init, initargs=(env or {},),
+                             max_tasks_per_child=1) as pool:
+        futures = [pool.submit(_participant, *args) for args in plan]
+        for fut in as_completed(futures):
+            try:
+                p = fut.result()
+            except Exception as e:
+                errors.append(f"{type(e).__name__}: {e}")
+                continue
+            done += 1
+            reruns += p["reruns"]
+            for phase, xs in p["latency"].items():
+                latency[phase] += xs
+            print(f"\r{done}/{users} participants finished", end="", file=sys.stderr, flush=True)
+    print(file=sys.stderr)
+    wall = time.perf_counter() - started
+
+    # largest single worker process (ru_maxrss is per process, not summed)
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    peak_mb = usage / (1024 * 1024) if sys.platform == "darwin" else usage / 1024
+    return {
+        "users": users, "concurrency": concurrency, "audio_share": audio_share,
+        "completed": done, "errors": errors, "wall_s": wall,
+        "participants_per_min": 60 * done / wall, "reruns_per_s": reruns / wall,
+        "scope": "per-worker",      # one app copy per participant, nothing shared
+        "peak_worker_rss_mb": peak_mb,
+        "phases": {phase: {"n": len(xs), "p50_ms": percentile(xs, 50),
+                           "p95_ms": percentile(xs, 95), "p99_ms": percentile(xs, 99),
+                           "mean_ms": statistics.fmean(xs)}
+                   for phase, xs in latency.items()},
+    }
+
+
+def report(r: dict):
+    print(f"{r['completed']}/{r['users']} participants finished in {r['wall_s']:.1f} s "
+          f"at concurrency {r['concurrency']} ({r['audio_share']:.0%} spoken answers)")
+    print("per-worker numbers: each participant ran its own app copy (no shared server)")
+    print(f"throughput: {r['participants_per_min']:.1f} participants/min, "
+          f"{r['reruns_per_s']:.1f} reruns/s; peak RSS {r['peak_worker_rss_mb']:.0f} MB per worker")
+    print(f"{'phase':<14}{'reruns':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for phase, s in r["phases"].items():
+        print(f"{phase:<14}{s['n']:>8}{s['p50_ms']:>10.1f}{s['p95_ms']:>10.1f}{s['p99_ms']:>10.1f}")
+    for e in r["errors"][:10]:
+        print(f"error: {e}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Simulated participants against app.py, one app worker each")
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=5)
+    parser.add_argument("--audio-share", type=float, default=0.5,
+                        help="fraction of participants who speak their answers")
+    parser.add_argument("--accuracy", type=float, default=0.7,
+                        help="chance each answer is right")
+    parser.add_argument("--timeout", type=float, default=60, help="per-rerun timeout (s)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", type=Path, help="write the report as JSON")
+    args = parser.parse_args(argv)
+
+    # applied in each worker before the app's modules read their configuration
+    tmp = tempfile.mkdtemp(prefix="remindful-loadtest-")
+    env = {"REMINDFUL_HISTORY_DB":    os.path.join(tmp, "history.db"),
+           "REMINDFUL_ARCHIVE_AUDIO": "0",
+           "REMINDFUL_STT_BACKEND":   "stub"}
+
+    result = run(args.users, args.concurrency, args.audio_share, args.accuracy,
+                 args.timeout, args.seed, env)
+    report(result)
+    if args.out:
+        args.out.write_text(json.dumps(result, indent=2))
+    return 1 if result["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
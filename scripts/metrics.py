@@ -0,0 +1,245 @@
+"""
+Lightweight instrumentation: timing spans, counters and gauges.
+
+Off unless REMINDFUL_METRICS=1; when off, `span()` hands back a shared
+no-op and every other call returns straight away. When on:
+
+  * every span is appended to a rotating JSON-lines log
+    (<dir>/metrics.jsonl, written by a background logging thread);
+  * totals are rendered in Prometheus text format to <dir>/metrics.prom
+    every REMINDFUL_METRICS_FLUSH_S seconds (point node_exporter's
+    textfile collector, or any scraper, at it).
+
+    python -m scripts.metrics              # p50/p95 per span from the log
+"""
+import argparse
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import statistics
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+
+ENABLED     = os.environ.get("REMINDFUL_METRICS", "0") == "1"
+METRICS_DIR = Path(os.environ.get("REMINDFUL_METRICS_DIR",
+                                  Path(__file__).resolve().parent.parent.parent / "data" / "metrics"))
+FLUSH_S     = float(os.environ.get("REMINDFUL_METRICS_FLUSH_S", "15"))
+LOG_BYTES   = 10 * 1024 * 1024
+LOG_BACKUPS = 5
+PREFIX      = "remindful_"
+BUCKETS     = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+_lock       = threading.Lock()
+_counters   = defaultdict(float)          # (name, labels) -> value
+_gauges     = {}                          # (name, labels) -> value
+_gauge_fns  = {}                          # name -> zero-arg callable
+_histograms = {}                          # (name, labels) -> [bucket counts…, sum, count]
+_log        = None
+_flusher    = None
+
+
+def _key(name: str, labels: dict) -> tuple:
+    return name, tuple(sorted(labels.items()))
+
+
+# — RECORDING ———————————————————————————————————————————
+def inc(name: str, value: float = 1, **labels):
+    """Add to a counter (exported as <name>_total)."""
+    if not ENABLED:
+        return
+    with _lock:
+        _counters[_key(name, labels)] += value
+    _start()
+
+
+def gauge(name: str, value: float, **labels):
+    if not ENABLED:
+        return
+    with _lock:
+        _gauges[_key(name, labels)] = value
+    _start()
+
+
+def gauge_fn(name: str, fn):
+    """Register a gauge that is read (by calling `fn()`) at export time."""
+    _gauge_fns[name] = fn
+
+
+def observe(name: str, seconds: float, **labels):
+    """Record one duration in the <name>_seconds histogram and the span log."""
+    if not ENABLED:
+        return
+    with _lock:
+        h = _histograms.get(_key(name, labels))
+        if h is None:
+            h = _histograms[_key(name, labels)] = [0] * (len(BUCKETS) + 2)
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                h[i] += 1
+                break
+        h[-2] += seconds
+        h[-1] += 1
+    _start()
+    _log.info(json.dumps({"t": round(time.time(), 3), "span": name,
+                          "s": round(seconds, 6), **labels}))
+
+
+class _Span:
+    __slots__ = ("name", "labels", "t0")
+
+    def __init__(self, name, labels):
+        self.name, self.labels = name, labels
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        observe(self.name, time.perf_counter() - self.t0,
+                **self.labels, **({"error": exc_type.__name__} if exc_type else {}))
+        return False
+
+
+class _NoSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NOOP = _NoSpan()
+
+
+def span(name: str, **labels):
+    """`with span("transcribe", backend="whisper"):` times the block."""
+    return _Span(name, labels) if ENABLED else _NOOP
+
+
+# — EXPORT ——————————————————————————————————————————————
+def _fmt_labels(labels: tuple, extra: str = "") -> str:
+    parts = [f'{k}="{str(v)}"' for k, v in labels]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def render() -> str:
+    """Current totals in Prometheus text exposition format."""
+    lines = []
+    with _lock:
+        counters, gauges = dict(_counters), dict(_gauges)
+        histograms = {k: list(v) for k, v in _histograms.items()}
+    for name, fn in _gauge_fns.items():
+        try:
+            gauges[(name, ())] = float(fn())
+        except Exception:
+            pass
+
+    for kind, items in (("counter", counters), ("gauge", gauges)):
+        for name in sorted({n for n, _ in items}):
+            full = PREFIX + name + ("_total" if kind == "counter" else "")
+            lines.append(f"# TYPE {full} {kind}")
+            lines += [f"{full}{_fmt_labels(l)} {v:g}" for (n, l), v in items.items() if n == name]
+    for name in sorted({n for n, _ in histograms}):
+        full = PREFIX + name + "_seconds"
+        lines.append(f"# TYPE {full} histogram")
+        for (n, labels), h in histograms.items():
+            if n != name:
+                continue
+            running = 0
+            for bound, count in zip(BUCKETS, h):
+                running += count
+                le = _fmt_labels(labels, f'le="{bound:g}"')
+                lines.append(f"{full}_bucket{le} {running}")
+            le = _fmt_labels(labels, 'le="+Inf"')
+            lines.append(f"{full}_bucket{le} {h[-1]}")
+            lines.append(f"{full}_sum{_fmt_labels(labels)} {h[-2]:.6f}")
+            lines.append(f"{full}_count{_fmt_labels(labels)} {h[-1]}")
+    return "\n".join(lines) + "\n"
+
+
+def flush():
+    """Write the scrape file now (atomically)."""
+    if not ENABLED:
+        return
+    path = METRICS_DIR / "metrics.prom"
+    tmp  = path.with_suffix(".prom.tmp")
+    tmp.write_text(render())
+    os.replace(tmp, path)
+
+
+def _start():
+    """Set up the span log and the scrape-file flusher on first use."""
+    global _log, _flusher
+    if _flusher is not None:
+        return
+    with _lock:
+        if _flusher is not None:
+            return
+        METRICS_DIR.mkdir(parents=True, exist_ok=True)
+        # the rotating file is written from a listener thread, never the caller
+        records = queue.SimpleQueue()
+        handler = logging.handlers.RotatingFileHandler(
+            METRICS_DIR / "metrics.jsonl", maxBytes=LOG_BYTES, backupCount=LOG_BACKUPS)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        listener = logging.handlers.QueueListener(records, handler)
+        listener.start()
+        _log = logging.getLogger("remindful.metrics")
+        _log.propagate = False
+        _log.setLevel(logging.INFO)
+        _log.addHandler(logging.handlers.QueueHandler(records))
+
+        def loop():
+            while True:
+                time.sleep(FLUSH_S)
+                try:
+                    flush()
+                except OSError:
+                    pass
+
+        _flusher = threading.Thread(target=loop, name="metrics-flush", daemon=True)
+        _flusher.start()
+        atexit.register(listener.stop)
+        atexit.register(flush)
+
+
+# — LOG SUMMARY —————————————————————————————————————————
+def summarize(path: Path) -> dict:
+    """{span: {"n", "p50_ms", "p95_ms", "max_ms"}} from a span log."""
+    durations = defaultdict(list)
+    for p in sorted(path.parent.glob(path.name + "*")):
+        with p.open() as f:
+            for line in f:
+                try:
+                    rec = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                label = rec["span"] + (f"[{rec['phase']}]" if "phase" in rec else "")
+                durations[label].append(rec["s"] * 1000)
+    out = {}
+    for label, xs in sorted(durations.items()):
+        xs.sort()
+        out[label] = {"n": len(xs), "p50_ms": statistics.median(xs),
+                      "p95_ms": xs[min(len(xs) - 1, int(0.95 * len(xs)))], "max_ms": xs[-1]}
+    return out
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Summarise the span log")
+    parser.add_argument("--log", type=Path, default=METRICS_DIR / "metrics.jsonl")
+    args = parser.parse_args(argv)
+    print(f"{'span':<36}{'n':>8}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}")
+    for label, s in summarize(args.log).items():
+        print(f"{label:<36}{s['n']:>8}{s['p50_ms']:>10.1f}{s['p95_ms']:>10.1f}{s['max_ms']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+import gc
+import os
+import threading
+import time
+
+# — CONFIG ——————————————————————————————————————————————
+# Override per deployment, e.g. REMINDFUL_WHISPER_MODEL=small
+MODEL_SIZE = os.environ.get("REMINDFUL_WHISPER_MODEL", "base")
+DEVICE     = os.environ.get("REMINDFUL_WHISPER_DEVICE") or None   # None ⇒ whisper picks
+IDLE_TTL   = float(os.environ.get("REMINDFUL_WHISPER_IDLE_TTL", "1800"))  # seconds, 0 = never
+
+# One entry per (engine, size, device), shared by every session in this server process
+_models    = {}   # (engine, size, device) -> model
+_last_used = {}   # (engine, size, device) -> time.monotonic()
+_loading   = {}   # (engine, size, device) -> lock held while that model loads
+_lock      = threading.Lock()   # guards the dicts above; never held during a load
+_reaper    = None
+
+
+def _load_whisper(size: str, device):
+    import whisper
+    return whisper.load_model(size, device=device)
+
+
+def _load_faster_whisper(size: str, device):
+    # CTranslate2 build of Whisper, int8-quantised for CPU-only nodes
+    from faster_whisper import WhisperModel
+    return WhisperModel(size, device=device or "cpu", compute_type="int8")
+
+
+LOADERS = {
+    "whisper":        _load_whisper,
+    "faster-whisper": _load_faster_whisper,
+}
+
+
+def _key(size, device, engine):
+    return (engine, size or MODEL_SIZE, device or DEVICE)
+
+
+def get_model(size: str | None = None, device: str | None = None,
+              engine: str = "whisper"):
+    """
+    Return the `engine` model for `size`/`device`, loading it at most once
+    per process. Safe to call from concurrent Streamlit sessions.
+    """
+    key = _key(size, device, engine)
+    with _lock:
+        model = _models.get(key)
+        if model is not None:
+            _last_used[key] = time.monotonic()
+            return model
+        loading = _loading.setdefault(key, threading.Lock())
+    # one load per key; lookups of other (loaded) models don't wait for it
+    with loading:
+        with _lock:
+            model = _models.get(key)
+        if model is None:
+            model = LOADERS[engine](*key[1:])
+        with _lock:
+            _models[key] = model
+            _last_used[key] = time.monotonic()
+    _start_reaper()
+    return model
+
+
+def _start_reaper():
+    """Evict idle models on a timer, so a server that goes quiet still frees them."""
+    global _reaper
+    if not IDLE_TTL or _reaper is not None:
+        return
+    with _lock:
+        if _reaper is not None:
+            return
+
+        def loop():
+            while True:
+                time.sleep(min(60.0, IDLE_TTL / 4))
+                evict_idle(IDLE_TTL)
+
+        _reaper = threading.Thread(target=loop, name="whisper-reaper", daemon=True)
+        _reaper.start()
+
+
+def warm_up(size: str | None = None, device: str | None = None,
+            engine: str = "whisper", background: bool = True):
+    """
+    Load a model ahead of the first answer. Runs in a daemon thread by
+    default so the first page render isn't held up by the model load.
+    """
+    if not background:
+        get_model(size, device, engine)
+        return None
+    t = threading.Thread(target=get_model, args=(size, device, engine),
+                         name="whisper-warmup", daemon=True)
+    t.start()
+    return t
+
+
+def loaded_models() -> list[tuple]:
+    """(engine, size, device) keys of the models currently held in memory."""
+    with _lock:
+        return list(_models)
+
+
+def release(size: str | None = None, device: str | None = None,
+            engine: str = "whisper") -> bool:
+    """Drop one model from the registry. Returns True if it was loaded."""
+    key = _key(size, device, engine)
+    with _lock:
+        model = _models.pop(key, None)
+        _last_used.pop(key, None)
+    if model is None:
+        return False
+    del model
+    _free_memory()
+    return True
+
+
+def evict_idle(max_idle: float = IDLE_TTL, keep=None) -> list[tuple]:
+    """Release every model not used in the last `max_idle` seconds."""
+    now = time.monotonic()
+    with _lock:
+        stale = [k for k, t in _last_used.items()
+                 if k != keep and now - t > max_idle]
+        for k in stale:
+            _models.pop(k, None)
+            _last_used.pop(k, None)
+    if stale:
+        _free_memory()
+    return stale
+
+
+def _free_memory():
+    gc.collect()
+    try:
+        import torch
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
+    except Exception:
+        pass
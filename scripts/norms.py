@@ -0,0 +1,177 @@
+"""
+Cohort norms, kept up to date as sessions finish.
+
+Each (age band, worry level) bucket — plus the "any" marginals — holds a
+running count/mean/variance (Welford) and an exact histogram of the score,
+which doubles as the quantile sketch since scores are small integers. The
+results page reads one row per lookup; nothing scans the history.
+
+    python -m scripts.norms --rebuild      # recompute from every stored session
+"""
+import argparse
+import json
+import math
+from pathlib import Path
+import numpy as np
+from scripts.history_store import HistoryStore
+
+ANY       = "*"
+METRICS   = ("immediate", "free", "cued", "intrusions", "total")
+MAX_SCORE = 48            # total = 3 × 16; every metric fits in 0..MAX_SCORE
+MIN_N     = 30            # smallest bucket we'll quote a percentile from
+AGE_BANDS = [(18, 39, "18–39"), (40, 59, "40–59"), (60, 69, "60–69"),
+             (70, 79, "70–79"), (80, 200, "80+")]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS norms (
+    age_band TEXT    NOT NULL,
+    worry    TEXT    NOT NULL,
+    metric   TEXT    NOT NULL,
+    n        INTEGER NOT NULL,
+    mean     REAL    NOT NULL,
+    m2       REAL    NOT NULL,
+    hist     TEXT    NOT NULL,       -- JSON list, counts for scores 0..MAX_SCORE
+    PRIMARY KEY (age_band, worry, metric)
+);
+"""
+
+
+def age_band(age) -> str:
+    if age is None:
+        return ANY
+    for lo, hi, label in AGE_BANDS:
+        if lo <= int(age) <= hi:
+            return label
+    return ANY
+
+
+def _buckets(age, worry) -> list[tuple]:
+    band, worry = age_band(age), worry or ANY
+    return list(dict.fromkeys([(band, worry), (band, ANY), (ANY, worry), (ANY, ANY)]))
+
+
+_ready = set()   # databases whose norms table is known to exist
+
+def _ensure_schema(store: HistoryStore):
+    if store.path not in _ready:
+        store.connection().executescript(SCHEMA)
+        _ready.add(store.path)
+
+
+# — INCREMENTAL UPDATE ————————————————————————————————————
+def record(store: HistoryStore, demographics: dict, scores: dict):
+    """Fold one finished session into every bucket it belongs to."""
+    _ensure_schema(store)
+    conn = store.connection()
+    conn.execute("BEGIN IMMEDIATE")    # serialise concurrent writers
+    try:
+        for band, worry in _buckets(demographics.get("age"), demographics.get("worry")):
+            for metric in METRICS:
+                if metric not in scores:
+                    continue
+                x = int(scores[metric])
+                row = conn.execute(
+                    "SELECT n, mean, m2, hist FROM norms WHERE age_band=? AND worry=? AND metric=?",
+                    (band, worry, metric)).fetchone()
+                n, mean, m2, hist = (row[0], row[1], row[2], json.loads(row[3])) if row \
+                    else (0, 0.0, 0.0, [0] * (MAX_SCORE + 1))
+                n += 1
+                delta = x - mean
+                mean += delta / n
+                m2   += delta * (x - mean)
+                hist[min(max(x, 0), MAX_SCORE)] += 1
+                conn.execute(
+                    "INSERT OR REPLACE INTO norms VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (band, worry, metric, n, mean, m2, json.dumps(hist)))
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+
+
+# — LOOKUP ————————————————————————————————————————————————
+def lookup(store: HistoryStore, age, worry, metric: str, value: int, min_n: int = MIN_N) -> dict | None:
+    """
+    Percentile of `value` among comparable participants: the narrowest
+    bucket with at least `min_n` people, falling back to wider ones.
+    Returns {"percentile", "n", "mean", "sd", "age_band", "worry"} or None.
+    """
+    _ensure_schema(store)
+    conn = store.connection()
+    for band, w in _buckets(age, worry):
+        row = conn.execute(
+            "SELECT n, mean, m2, hist FROM norms WHERE age_band=? AND worry=? AND metric=?",
+            (band, w, metric)).fetchone()
+        if row and row[0] >= min_n:
+            n, mean, m2, hist = row[0], row[1], row[2], json.loads(row[3])
+            below = sum(hist[:value])
+            # mid-rank percentile: ties count half
+            pct = 100 * (below + 0.5 * hist[value]) / n if 0 <= value <= MAX_SCORE else None
+            return {"percentile": pct, "n": n, "mean": mean,
+                    "sd": math.sqrt(m2 / (n - 1)) if n > 1 else 0.0,
+                    "age_band": band, "worry": w}
+    return None
+
+
+# — BATCH REBUILD ——————————————————————————————————————————
+def rebuild(store: HistoryStore, chunk: int = 50_000) -> int:
+    """Recompute every bucket from the stored sessions. Returns sessions used."""
+    import pandas as pd
+
+    columns = ["sid", "age_band", "worry", *METRICS]
+    frames, rows = [], []
+    for s in store.iter_sessions(batch_size=chunk, completed_only=True):
+        d, sc = s["demographics"], s["scores"]
+        if not sc:
+            continue
+        rows.append([len(rows) + chunk * len(frames), age_band(d.get("age")),
+                     d.get("worry") or ANY, *[sc.get(m, np.nan) for m in METRICS]])
+        if len(rows) >= chunk:
+            frames.append(pd.DataFrame(rows, columns=columns))
+            rows = []
+    if rows:
+        frames.append(pd.DataFrame(rows, columns=columns))
+    base = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=columns)
+
+    # marginals: each session also counts once in its "any" buckets
+    df = pd.concat([base,
+                    base.assign(worry=ANY),
+                    base.assign(age_band=ANY),
+                    base.assign(age_band=ANY, worry=ANY)], ignore_index=True)
+    df = df.drop_duplicates(subset=["sid", "age_band", "worry"])
+    long = df.melt(id_vars=["age_band", "worry"], value_vars=list(METRICS),
+                   var_name="metric", value_name="x").dropna()
+    long["x"] = long["x"].astype(int).clip(0, MAX_SCORE)
+
+    out = []
+    for (band, worry, metric), g in long.groupby(["age_band", "worry", "metric"]):
+        x = g["x"].to_numpy()
+        mean = float(x.mean())
+        out.append((band, worry, metric, int(len(x)), mean,
+                    float(((x - mean) ** 2).sum()),
+                    json.dumps(np.bincount(x, minlength=MAX_SCORE + 1).tolist())))
+
+    _ensure_schema(store)
+    conn = store.connection()
+    with conn:
+        conn.execute("DELETE FROM norms")
+        conn.executemany("INSERT INTO norms VALUES (?, ?, ?, ?, ?, ?, ?)", out)
+    return len(base)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cohort norms maintenance")
+    parser.add_argument("--db", type=Path,
+                        default=Path(__file__).resolve().parent.parent.parent / "data" / "history.db")
+    parser.add_argument("--rebuild", action="store_true",
+                        help="recompute all buckets from stored sessions")
+    args = parser.parse_args(argv)
+    store = HistoryStore(args.db)
+    if args.rebuild:
+        print(f"Rebuilt norms from {rebuild(store):,} sessions")
+    else:
+        parser.print_help()
+
+
+if __name__ == "__main__":
+    main()
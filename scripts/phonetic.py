@@ -0,0 +1,233 @@
+"""
+Precomputed answer index: turns most spoken-answer matching into a
+dictionary lookup.
+
+For each test word the index holds its normalised spelling (lower case,
+no spaces/hyphens/punctuation, so "wood pecker" finds "woodpecker"), its
+plural/singular forms, any accepted aliases from aliases.json (common
+transcription slips such as "autumn" for "ottoman"; spelling variants
+like "colour" belong there too), and a Metaphone key so homophones
+("center"/"centaur") land on the same word. Keys shared by two words of
+the same list are dropped as ambiguous, and a sound-alike only counts if
+it is also spelt reasonably close to the word ("lament" sounds like
+"lemonade" but is an intrusion).
+
+confusables.json lists real, different words that sit close enough to a
+test word to pass fuzzy matching ("macaroni"/"macaron",
+"mustard"/"custard"); those are rejected outright. Anything else not
+found falls back to fuzzy matching in the caller, so only the odd miss
+pays for rapidfuzz.
+"""
+import json
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from rapidfuzz import fuzz
+
+ALIASES_PATH     = Path(__file__).resolve().parent / "aliases.json"
+CONFUSABLES_PATH = Path(__file__).resolve().parent / "confusables.json"
+
+_NON_ALPHA = re.compile(r"[^a-z]")
+_VOWELS    = set("aeiou")
+_SOFTENS   = set("iey")       # c/g before these sound like s/j
+_DIGRAPH_H = set("csptg")     # h after these is part of the digraph
+
+# Shorter Metaphone keys ("TRT": trout, treat, tart…) match too much to trust
+MIN_SOUND_KEY = 4
+
+# Similarity (rapidfuzz ratio) a sound-alike must also have to the word
+PHONETIC_FLOOR = 70
+
+
+def normalise(text: str) -> str:
+    """Lower-case letters only: "Jet-Ski." → "jetski"."""
+    return _NON_ALPHA.sub("", text.lower())
+
+
+# — METAPHONE ———————————————————————————————————————————
+@lru_cache(maxsize=8192)
+def metaphone(word: str) -> str:
+    """
+    Simplified Metaphone (Lawrence Philips, 1990): a consonant skeleton
+    that sounds-alike spellings share. Vowels are kept only as a leading "A".
+    """
+    w = normalise(word)
+    if not w:
+        return ""
+    # silent or special openings
+    if w[:2] in ("kn", "gn", "pn", "ae", "wr"):
+        w = w[1:]
+    if w[0] == "x":
+        w = "s" + w[1:]
+    if w[:2] == "wh":
+        w = "w" + w[2:]
+
+    out = []
+    n = len(w)
+    for i, c in enumerate(w):
+        prev = w[i - 1] if i else ""
+        nxt  = w[i + 1] if i + 1 < n else ""
+        nxt2 = w[i + 2] if i + 2 < n else ""
+        if c == prev and c != "c":
+            continue
+        if c in _VOWELS:
+            if i == 0:
+                out.append("A")
+        elif c == "b":
+            if not (prev == "m" and i == n - 1):
+                out.append("B")
+        elif c == "c":
+            if nxt == "i" and nxt2 == "a" or nxt == "h":
+                out.append("K" if prev == "s" else "X")
+            elif nxt in _SOFTENS:
+                if prev != "s":
+                    out.append("S")
+            else:
+                out.append("K")
+        elif c == "d":
+            out.append("J" if nxt == "g" and nxt2 in _SOFTENS else "T")
+        elif c == "g":
+            if nxt == "h" and nxt2 and nxt2 not in _VOWELS:
+                continue                       # "night"
+            if nxt == "n" and (i + 2 == n or w[i + 2:] == "ed"):
+                continue                       # "sign", "signed"
+            if prev == "d" and nxt in _SOFTENS:
+                continue                       # "fudge": the D already made J
+            out.append("J" if nxt in _SOFTENS else "K")
+        elif c == "h":
+            if prev in _VOWELS or prev in _DIGRAPH_H or nxt not in _VOWELS:
+                continue
+            out.append("H")
+        elif c == "k":
+            if prev != "c":
+                out.append("K")
+        elif c == "p":
+            out.append("F" if nxt == "h" else "P")
+        elif c == "q":
+            out.append("K")
+        elif c == "s":
+            if nxt == "h" or (nxt == "i" and nxt2 in ("o", "a")):
+                out.append("X")
+            else:
+                out.append("S")
+        elif c == "t":
+            if nxt == "i" and nxt2 in ("o", "a"):
+                out.append("X")
+            elif nxt == "h":
+                out.append("0")                # "th"
+            elif not (nxt == "c" and nxt2 == "h"):
+                out.append("T")
+        elif c == "v":
+            out.append("F")
+        elif c in "wy":
+            if nxt in _VOWELS:
+                out.append(c.upper())
+        elif c == "x":
+            out.append("KS")
+        elif c == "z":
+            out.append("S")
+        else:                                  # f j l m n r
+            out.append(c.upper())
+    # collapse repeats produced by different letters ("ck" → K, "ph"+"f" …)
+    key = "".join(out)
+    return re.sub(r"(.)\1+", r"\1", key)
+
+
+# — WORD FORMS ——————————————————————————————————————————
+def inflections(word: str) -> set[str]:
+    """Normalised singular/plural forms of `word`."""
+    w = normalise(word)
+    forms = {w, w + "s"}
+    if w.endswith(("s", "x", "z", "ch", "sh")):
+        forms.add(w + "es")
+    if w.endswith("y") and len(w) > 1 and w[-2] not in _VOWELS:
+        forms.add(w[:-1] + "ies")
+    if w.endswith("f"):
+        forms.add(w[:-1] + "ves")
+    if w.endswith("s") and not w.endswith(("ss", "us")):
+        forms.add(w[:-1])                      # "marbles" → "marble"
+    return forms
+
+
+@lru_cache(maxsize=4)
+def load_word_lists(path: str) -> dict:
+    """{normalised word: [spellings]} from a JSON file (missing file → none)."""
+    try:
+        raw = json.loads(Path(path).read_text())
+    except (OSError, json.JSONDecodeError):
+        return {}
+    return {normalise(word): list(aliases) for word, aliases in raw.items()}
+
+
+# — INDEX ———————————————————————————————————————————————
+@dataclass(frozen=True)
+class MatchIndex:
+    """Exact and phonetic lookup from a response to the cue whose word it names."""
+    forms: dict = field(default_factory=dict)      # normalised spelling -> cue
+    sounds: dict = field(default_factory=dict)     # metaphone key -> cue
+    spelled: dict = field(default_factory=dict)    # cue -> normalised word
+    rejects: frozenset = frozenset()               # confusable spellings
+
+    @classmethod
+    def build(cls, words: dict) -> "MatchIndex":
+        aliases     = load_word_lists(str(ALIASES_PATH))
+        confusables = load_word_lists(str(CONFUSABLES_PATH))
+        forms, sounds, clashes = {}, {}, set()
+
+        def add(table, key, cue):
+            if key in clashes:
+                return
+            if table.get(key, cue) != cue:
+                clashes.add(key)
+                del table[key]
+            else:
+                table[key] = cue
+
+        for cue, word in words.items():
+            spellings = set(inflections(word))
+            for alias in aliases.get(normalise(word), []):
+                spellings |= inflections(alias)
+            for s in spellings:
+                add(forms, s, cue)
+            for s in {normalise(word), *map(normalise, aliases.get(normalise(word), []))}:
+                key = metaphone(s)
+                if len(key) >= MIN_SOUND_KEY:
+                    add(sounds, key, cue)
+        rejects = {form for word in words.values()
+                   for other in confusables.get(normalise(word), [])
+                   for form in inflections(other)}
+        return cls(forms, sounds, {cue: normalise(w) for cue, w in words.items()},
+                   frozenset(rejects - set(forms)))
+
+    def lookup(self, response: str) -> tuple[str | None, str]:
+        """
+        (cue, "exact" | "phonetic") for a response; (None, "reject") for a
+        known confusable, which must not be fuzzy-matched either; (None, "")
+        on a miss.
+        """
+        said = normalise(response)
+        if not said:
+            return None, ""
+        if said in self.rejects:
+            return None, "reject"
+        cue = self.forms.get(said)
+        if cue is not None:
+            return cue, "exact"
+        key = metaphone(said)
+        cue = self.sounds.get(key)
+        if cue is None and key.endswith("S"):
+            cue = self.sounds.get(key[:-1])    # phonetic plural
+        if cue is None or fuzz.ratio(said, self.spelled[cue]) < PHONETIC_FLOOR:
+            return None, ""
+        return cue, "phonetic"
+
+
+@lru_cache(maxsize=256)
+def _cached_index(items: tuple) -> MatchIndex:
+    return MatchIndex.build(dict(items))
+
+
+def match_index(words: dict) -> MatchIndex:
+    """The index for a {cue: word} list, built once per distinct list."""
+    return _cached_index(tuple(words.items()))
@@ -0,0 +1,171 @@
+"""
+Re-score every stored session with the current scoring rules.
+
+    python -m scripts.rescore --db ../data/history.db --out results/
+    python -m scripts.rescore --threshold 80 --format parquet --workers 8
+
+Output goes to <out>/rescore-v<SCORING_VERSION>-t<threshold>/ as a
+per-session table and a per-item table. Re-running the same command
+resumes after the last finished batch.
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+from scripts.catalog import build_catalog
+from scripts.export import ITEM_COLUMNS, SESSION_COLUMNS, TableWriter, item_rows, session_row
+from scripts.history_store import HistoryStore
+from scripts.scoring import MATCH_THRESHOLD, SCORING_VERSION, score_sessions
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+# — WORKER SIDE ——————————————————————————————————————————
+_catalog = None
+_options = {}
+
+def _init_worker(tests_dir: str, threshold: float, retranscribe: bool):
+    global _catalog
+    _catalog = build_catalog(tests_dir)
+    _options.update(threshold=threshold, retranscribe=retranscribe)
+
+def _retranscribe(session: dict, words: dict):
+    """Replace stored answers with fresh transcripts of the archived audio."""
+    from scripts.tts_stt import transcribe_audio, transcribe_word
+    responses = session["responses"]
+    immediate = dict(responses.get("immediate", {}))
+    cued      = dict(responses.get("cued", {}))
+    free      = []
+    for key, path in sorted(responses.get("audio_paths", {}).items()):
+        if not os.path.exists(path):
+            continue
+        if key.startswith("imm_audio_"):
+            immediate[key.split("_", 3)[3]] = transcribe_word(path, words.values())[0]
+        elif key.startswith("cr_audio_"):
+            cued[key[len("cr_audio_"):]] = transcribe_word(path, words.values())[0]
+        elif key.startswith("free_recall"):
+            free += transcribe_audio(path).split()
+    return immediate, free or responses.get("free", []), cued
+
+def _score_batch(sessions: list[dict]) -> tuple[list, list, list, dict]:
+    """
+    Score one batch; returns (session rows, item rows, scored session ids,
+    {missing version: unscored session ids}).
+    """
+    threshold = _options["threshold"]
+    by_version = {}
+    for s in sessions:
+        by_version.setdefault(s["version"], []).append(s)
+
+    session_rows, items, scored, missing = [], [], [], {}
+    for name, group in by_version.items():
+        version = _catalog.get(name)
+        if version is None:
+            # word list no longer on disk: reported, and retried on the next run
+            missing[name] = [s["session_id"] for s in group]
+            continue
+        inputs = []
+        for s in group:
+            r = s["responses"]
+            if _options["retranscribe"] and r.get("audio_paths"):
+                inputs.append(_retranscribe(s, version.words))
+            else:
+                inputs.append((r.get("immediate", {}), r.get("free", []), r.get("cued", {})))
+        for s, score in zip(group, score_sessions(version.words, inputs, threshold)):
+            session_rows.append(session_row(s, score, threshold))
+            items += item_rows(s, score)
+        scored += [s["session_id"] for s in group]
+    return session_rows, items, scored, missing
+
+# — BATCHING ——————————————————————————————————————————————
+def _batches(store: HistoryStore, size: int, skip: set):
+    batch = []
+    for s in store.iter_sessions(batch_size=size, completed_only=True):
+        if s["session_id"] in skip:
+            continue
+        batch.append(s)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+# — DRIVER ————————————————————————————————————————————————
+def rescore(db: Path, tests_dir: Path, out: Path, threshold: float = MATCH_THRESHOLD,
+            fmt: str = "csv", workers: int | None = None, batch_size: int = 500,
+            retranscribe: bool = False, resume: bool = True) -> Path:
+    out_dir = out / f"rescore-v{SCORING_VERSION}-t{threshold:g}"
+    out_dir.mkdir(parents=True, exist_ok=True)
+    done_path = out_dir / "_done.txt"
+    if not resume:
+        for p in out_dir.iterdir():
+            p.unlink()
+    done = set(done_path.read_text().split()) if done_path.exists() else set()
+
+    store    = HistoryStore(db)
+    total    = store.count(completed_only=True)
+    sessions = TableWriter(out_dir, "sessions", SESSION_COLUMNS, fmt)
+    items    = TableWriter(out_dir, "items", ITEM_COLUMNS, fmt)
+    workers  = workers or os.cpu_count() or 1
+    finished = len(done)
+    skipped  = {}          # version -> sessions left unscored because it's missing
+    started  = time.perf_counter()
+
+    with ProcessPoolExecutor(workers, initializer=_init_worker,
+                             initargs=(str(tests_dir), threshold, retranscribe)) as pool, \
+         done_path.open("a") as done_log:
+        pending = set()
+        batches = _batches(store, batch_size, done)
+        while True:
+            # keep a bounded number of batches in flight so memory stays flat
+            for batch in batches:
+                pending.add(pool.submit(_score_batch, batch))
+                if len(pending) >= workers * 2:
+                    break
+            if not pending:
+                break
+            ready, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in ready:
+                session_rows, item_rows, ids, missing = fut.result()
+                sessions.write(session_rows)
+                items.write(item_rows)
+                # only mark a batch done once its rows are on disk
+                if ids:
+                    done_log.write("\n".join(ids) + "\n")
+                    done_log.flush()
+                finished += len(ids)
+                for name, unscored in missing.items():
+                    skipped[name] = skipped.get(name, 0) + len(unscored)
+                    finished += len(unscored)
+            rate = (finished - len(done)) / max(time.perf_counter() - started, 1e-9)
+            print(f"\rrescored {finished}/{total} sessions ({rate:,.0f}/s)",
+                  end="", file=sys.stderr, flush=True)
+    print(file=sys.stderr)
+    for name, n in sorted(skipped.items()):
+        print(f"skipped {n} session(s) of {name}: no such word list in {tests_dir}",
+              file=sys.stderr)
+    return out_dir
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--db", type=Path, default=BASE_DIR.parent / "data" / "history.db")
+    parser.add_argument("--tests", type=Path, default=BASE_DIR / "tests")
+    parser.add_argument("--out", type=Path, default=Path("results"))
+    parser.add_argument("--threshold", type=float, default=MATCH_THRESHOLD)
+    parser.add_argument("--format", choices=["csv", "parquet"], default="csv")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--retranscribe", action="store_true",
+                        help="re-run speech-to-text on archived audio first")
+    parser.add_argument("--no-resume", action="store_true",
+                        help="discard earlier output for this version/threshold")
+    args = parser.parse_args(argv)
+    out_dir = rescore(args.db, args.tests, args.out, args.threshold, args.format,
+                      args.workers, args.batch_size, args.retranscribe, not args.no_resume)
+    print(f"Results written to {out_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,27 @@
-from rapidfuzz import fuzz
+from dataclasses import dataclass, field
+import numpy as np
+from rapidfuzz import fuzz, process
+from scripts.phonetic import match_index
 
-def score_responses(expected, actual, threshold=85):
+# Similarity (0–100, rapidfuzz ratio) a response needs to count as the word.
+# Every score in the app goes through this one number.
+MATCH_THRESHOLD = 85
+
+# Bump when the scoring rules change, so re-scored tables stay distinguishable
+SCORING_VERSION = 3
+
+_PUNCT = ".,!?;:\"'"
+
+
+def is_match(response: str, word: str, threshold: float = MATCH_THRESHOLD) -> bool:
+    """Does one response count as `word`?"""
+    cue, how = match_index({word: word}).lookup(response)
+    if how:
+        return cue is not None
+    return fuzz.ratio(word.lower(), response.lower().strip()) >= threshold
+
+
+def score_responses(expected, actual, threshold=MATCH_THRESHOLD):
     """Compares actual responses to expected words, returns score and details."""
     score = 0
     details = {}
@@ -16,4 +37,144 @@ def score_responses(expected, actual, threshold=85):
         }
         if match:
             score += 1
-    return score, details
\ No newline at end of file
+    return score, details
+
+
+@dataclass
+class SessionScore:
+    """All scores for one session, plus per-cue details."""
+    immediate: int
+    free: int
+    cued: int
+    intrusions: int
+    missed: list = field(default_factory=list)     # cues not produced in free recall
+    details: dict = field(default_factory=dict)    # cue -> per-item breakdown
+
+    @property
+    def total(self) -> int:
+        return self.immediate + self.free + self.cued
+
+    def totals(self) -> dict:
+        return {"immediate": self.immediate, "free": self.free, "cued": self.cued,
+                "intrusions": self.intrusions, "total": self.total}
+
+
+def free_candidates(free_words) -> list[str]:
+    """
+    Free-recall tokens to match against the list: each word, plus each
+    adjacent pair glued together so "wood pecker" can match "woodpecker".
+    """
+    tokens = [t.strip(_PUNCT).lower() for w in free_words for t in str(w).split()]
+    tokens = [t for t in tokens if t]
+    return tokens + [a + b for a, b in zip(tokens, tokens[1:])]
+
+
+def _similarity(words: dict, rows: list[str], workers: int = 1) -> np.ndarray:
+    """
+    rows × words similarity (uint8, 0–100). Each distinct response is
+    resolved once: index hits are 100 for their word and 0 elsewhere,
+    blanks and known confusables are all 0, and the rest are
+    fuzzy-matched together.
+    """
+    index = match_index(words)
+    col   = {cue: i for i, cue in enumerate(words)}
+    sim   = np.zeros((len(rows), len(words)), dtype=np.uint8)
+    where = {}
+    for r, text in enumerate(rows):
+        if text:
+            where.setdefault(text, []).append(r)
+    misses, miss_rows = [], []
+    for text, at in where.items():
+        cue, how = index.lookup(text)
+        if cue is not None:
+            sim[at, col[cue]] = 100
+        elif how != "reject":
+            misses.append(text)
+            miss_rows.append(at)
+    if misses:
+        fuzzy = process.cdist(misses, [w.lower() for w in words.values()],
+                              scorer=fuzz.ratio, dtype=np.uint8, workers=workers)
+        for at, row in zip(miss_rows, fuzzy):
+            sim[at] = row
+    return sim
+
+
+def score_sessions(words: dict, sessions, threshold: float = MATCH_THRESHOLD) -> list[SessionScore]:
+    """
+    Score many sessions of the same test version in one pass.
+
+    `words` is {cue: word}; each session is (immediate, free, cued) with
+    immediate/cued as {cue: response} and free as a list of words. Each
+    response is first looked up in the version's precomputed answer index
+    (spelling, plural, alias or sound-alike → similarity 100); only the
+    misses of every session go to a single multi-threaded
+    `rapidfuzz.process.cdist` call.
+    """
+    sessions = list(sessions)
+    cues  = list(words)
+    n     = len(cues)
+
+    rows, spans = [], []
+    for immediate, free, cued in sessions:
+        start = len(rows)
+        rows += [str(immediate.get(c, "")).lower().strip() for c in cues]
+        rows += [str(cued.get(c, "")).lower().strip() for c in cues]
+        cand  = free_candidates(free)
+        rows += cand
+        spans.append((start, len(cand)))
+
+    sim  = _similarity(words, rows, workers=-1)
+    diag = np.arange(n)
+
+    results = []
+    for (start, n_free), (immediate, free, cued) in zip(spans, sessions):
+        imm_sim  = sim[start:start + n, :][diag, diag]
+        cued_sim = sim[start + n:start + 2 * n, :][diag, diag]
+        free_block = sim[start + 2 * n:start + 2 * n + n_free, :]
+        free_sim = free_block.max(axis=0) if n_free else np.zeros(n, dtype=np.uint8)
+
+        imm_hit  = imm_sim >= threshold
+        free_hit = free_sim >= threshold
+        cued_hit = cued_sim >= threshold
+        answered = np.array([bool(str(cued.get(c, "")).strip()) for c in cues])
+        missed   = ~free_hit
+
+        details = {
+            cue: {
+                "expected": words[cue],
+                "immediate": str(immediate.get(cue, "")).lower().strip(),
+                "immediate_similarity": int(imm_sim[i]),
+                "immediate_match": bool(imm_hit[i]),
+                "free_similarity": int(free_sim[i]),
+                "free_match": bool(free_hit[i]),
+                "cued": str(cued.get(cue, "")).lower().strip(),
+                "cued_similarity": int(cued_sim[i]),
+                "cued_match": bool(missed[i] and cued_hit[i]),
+            }
+            for i, cue in enumerate(cues)
+        }
+        results.append(SessionScore(
+            immediate=int(imm_hit.sum()),
+            free=int(free_hit.sum()),
+            cued=int((missed & cued_hit).sum()),
+            # a wrong (non-blank) cued answer for a word missed in free recall
+            intrusions=int((missed & answered & ~cued_hit).sum()),
+            missed=[c for c, m in zip(cues, missed) if m],
+            details=details,
+        ))
+    return results
+
+
+def score_session(words: dict, immediate: dict, free, cued: dict,
+                  threshold: float = MATCH_THRESHOLD) -> SessionScore:
+    """Immediate, free, cued and intrusion scores for one session."""
+    return score_sessions(words, [(immediate, free, cued)], threshold)[0]
+
+
+def free_recall_hits(words: dict, free_words, threshold: float = MATCH_THRESHOLD) -> set:
+    """Cues whose word was produced (fuzzily) in free recall."""
+    cand = free_candidates(free_words)
+    if not cand:
+        return set()
+    sim = _similarity(words, cand)
+    return {cue for cue, hit in zip(words, (sim >= threshold).any(axis=0)) if hit}
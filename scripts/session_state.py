@@ -0,0 +1,142 @@
+"""
+One participant's progress through the test, as a single typed object.
+
+Replaces the loose st.session_state keys (spoken_*, imm_spoken_*,
+imm_retry_*, cue_iter, …): per-cue flags live in one bytearray indexed by
+the cue's position in the word list, phases move only along TRANSITIONS,
+and the whole thing round-trips through a compact JSON string so it can be
+checkpointed to the history store and resumed.
+"""
+import json
+from dataclasses import dataclass, field
+from enum import IntEnum, IntFlag
+
+
+class Phase(IntEnum):
+    DEMOGRAPHICS = 0
+    INSTRUCTIONS = 1
+    CONTROLLED   = 2
+    IMMEDIATE    = 3
+    INTERFERENCE = 4
+    FREE_RECALL  = 5
+    CUED_RECALL  = 6
+    RESULTS      = 7
+
+
+TRANSITIONS = {
+    Phase.DEMOGRAPHICS: {Phase.INSTRUCTIONS},
+    Phase.INSTRUCTIONS: {Phase.CONTROLLED},
+    Phase.CONTROLLED:   {Phase.IMMEDIATE},
+    Phase.IMMEDIATE:    {Phase.CONTROLLED, Phase.INTERFERENCE},
+    Phase.INTERFERENCE: {Phase.FREE_RECALL},
+    Phase.FREE_RECALL:  {Phase.CUED_RECALL},
+    Phase.CUED_RECALL:  {Phase.RESULTS},
+    Phase.RESULTS:      set(),
+}
+
+
+class Cue(IntFlag):
+    """Per-cue bits, one byte per cue."""
+    LEARN_SPOKEN = 1     # cue read out during controlled learning
+    IMM_SPOKEN   = 2     # cue read out during immediate recall
+    IMM_RETRY    = 4     # guided retry already given
+    IMM_DONE     = 8
+    CUED_ASKED   = 16    # missed in free recall, so asked in cued recall
+    CUED_DONE    = 32
+
+
+class InvalidTransition(ValueError):
+    pass
+
+
+@dataclass(slots=True)
+class SessionState:
+    session_id: str
+    started_at: str
+    n_cues: int = 16
+    phase: Phase = Phase.DEMOGRAPHICS
+    version: str | None = None
+    user_id: str = ""
+    sheet_index: int = 0
+    item_index: int = 0
+    flags: bytearray = field(default_factory=bytearray)
+    demographics: dict = field(default_factory=dict)
+    responses_immediate: dict = field(default_factory=dict)
+    free_transcript: list = field(default_factory=list)
+    cued_responses: dict = field(default_factory=dict)
+    confidence: dict = field(default_factory=dict)   # "immediate"/"cued" -> {cue: 0–100}
+    interference: dict | None = None
+    timings: dict = field(default_factory=dict)      # phase name -> first seen
+    free_takes: int = 1                              # free-recall recordings so far
+    audio_paths: dict = field(default_factory=dict)  # recording key -> archived file
+    audio_clips: dict = field(default_factory=dict)  # recording key -> archive digest
+    saved: bool = False
+
+    def __post_init__(self):
+        if len(self.flags) != self.n_cues:
+            self.flags = bytearray(self.n_cues)
+
+    @property
+    def use_audio(self) -> bool:
+        return bool(self.demographics.get("use_audio"))
+
+    # — PHASES ————————————————————————————————————————————
+    def go(self, phase: Phase):
+        if phase not in TRANSITIONS[self.phase]:
+            raise InvalidTransition(f"{self.phase.name} -> {phase.name}")
+        self.phase = phase
+
+    @property
+    def progress(self) -> float:
+        return self.phase / (len(Phase) - 1)
+
+    # — PER-CUE FLAGS —————————————————————————————————————
+    def has(self, i: int, flag: Cue) -> bool:
+        return bool(self.flags[i] & flag)
+
+    def mark(self, i: int, flag: Cue):
+        self.flags[i] |= flag
+
+    def first_without(self, flag: Cue, among=None) -> int | None:
+        """Lowest cue index (optionally within `among`) lacking `flag`."""
+        for i in (range(self.n_cues) if among is None else among):
+            if not self.flags[i] & flag:
+                return i
+        return None
+
+    def count(self, flag: Cue, among=None) -> int:
+        return sum(1 for i in (range(self.n_cues) if among is None else among)
+                   if self.flags[i] & flag)
+
+    def next_cued(self) -> int | None:
+        """Next cue to ask in cued recall; None once all have been asked."""
+        for i, f in enumerate(self.flags):
+            if f & Cue.CUED_ASKED and not f & Cue.CUED_DONE:
+                return i
+        return None
+
+    # — SERIALIZATION —————————————————————————————————————
+    def dumps(self) -> str:
+        return json.dumps({
+            "id": self.session_id, "t0": self.started_at, "n": self.n_cues,
+            "p": int(self.phase), "v": self.version, "u": self.user_id,
+            "s": self.sheet_index, "i": self.item_index, "f": self.flags.hex(),
+            "d": self.demographics, "ri": self.responses_immediate,
+            "fr": self.free_transcript, "cr": self.cued_responses,
+            "it": self.interference, "tm": self.timings, "cf": self.confidence,
+            "ft": self.free_takes, "ap": self.audio_paths, "ac": self.audio_clips,
+        }, separators=(",", ":"), ensure_ascii=False)
+
+    @classmethod
+    def loads(cls, blob: str) -> "SessionState":
+        d = json.loads(blob)
+        return cls(
+            session_id=d["id"], started_at=d["t0"], n_cues=d["n"],
+            phase=Phase(d["p"]), version=d["v"], user_id=d["u"],
+            sheet_index=d["s"], item_index=d["i"], flags=bytearray.fromhex(d["f"]),
+            demographics=d["d"], responses_immediate=d["ri"],
+            free_transcript=d["fr"], cued_responses=d["cr"],
+            interference=d["it"], timings=d["tm"], confidence=d.get("cf", {}),
+            free_takes=d.get("ft", 1), audio_paths=d.get("ap", {}),
+            audio_clips=d.get("ac", {}),
+        )
@@ -0,0 +1,136 @@
+import json
+import os
+import time
+from concurrent.futures import CancelledError, TimeoutError
+import streamlit as st
+import streamlit.components.v1 as components
+from scripts import metrics, tts_cache
+from scripts.audio_handler import record_clip, forget_clips, split_chunks
+from scripts.helpers import merge_transcripts
+from scripts.tts_stt import submit_transcription
+
+STT_TIMEOUT = float(os.environ.get("REMINDFUL_STT_TIMEOUT", "30"))  # seconds
+
+def _jobs() -> dict:
+    # key -> {"digest", "futures", "since"}; lives in session state across reruns
+    return st.session_state.setdefault("_stt_jobs", {})
+
+def cancel_answers(keep=None):
+    """Drop pending transcriptions, e.g. when the participant moves on."""
+    keep = {keep} if isinstance(keep, str) else set(keep or ())
+    jobs = _jobs()
+    for key in [k for k in jobs if k not in keep]:
+        for fut in jobs.pop(key)["futures"]:
+            fut.cancel()
+    forget_clips(keep)
+
+def _start(key: str, clip, submit) -> dict:
+    job = _jobs().get(key)
+    if job is None or job["digest"] != clip.digest:
+        if job:
+            for fut in job["futures"]:
+                fut.cancel()
+        job = {"digest": clip.digest, "since": time.monotonic(),
+               "futures": submit(clip)}
+        _jobs()[key] = job
+    return job
+
+def _collect(job: dict, wait: float, partial: bool = False) -> str | None:
+    """
+    Text of a job once every future is done. With `partial`, returns the
+    merged text of the chunks finished so far while the rest are pending.
+    """
+    texts = []
+    deadline = time.monotonic() + wait
+    try:
+        for fut in job["futures"]:
+            try:
+                result = fut.result(timeout=max(0.0, deadline - time.monotonic()))
+            except TimeoutError:
+                if time.monotonic() - job["since"] > STT_TIMEOUT:
+                    fut.cancel()
+                    st.error("❌ Transcription took too long—please type your answer.")
+                else:
+                    st.info("⏳ Transcribing your answer…")
+                return merge_transcripts(texts) if partial and texts else None
+            if isinstance(result, tuple):
+                # single-word mode → (word, confidence)
+                result, job["confidence"] = result
+            texts.append(result)
+    except CancelledError:
+        return None
+    except Exception as e:
+        st.error(f"❌ Couldn’t transcribe recording: {e}")
+        return None
+    return merge_transcripts(texts) if len(texts) > 1 else texts[0]
+
+def spoken_answer(key: str, wait: float = 0.0, vocabulary=None) -> str | None:
+    """
+    Show the recorder for `key` and return what was said (or None).
+    Transcription runs on the shared worker pool; while it is pending this
+    returns None and a later rerun picks the result up from session state.
+    Pass the test's word list as `vocabulary` for one-word answers: a
+    result close enough to score as a list word is snapped to it; anything
+    else is returned as heard (see `answer_confidence`).
+    """
+    cancel_answers(keep=key)
+    clip = record_clip(key=key)
+    if clip is None:
+        return None
+    job = _start(key, clip, lambda c: [
+        submit_transcription(c.samples, c.digest, vocabulary=vocabulary)])
+    return _collect(job, wait)
+
+def spoken_passage(key: str, wait: float = 0.0) -> str | None:
+    """
+    Recorder for long answers (free recall). The clip is split into
+    overlapping chunks that are transcribed in parallel; until all are
+    done this returns the merged text of the chunks finished so far.
+    """
+    clip = record_clip(key=key)
+    if clip is None:
+        return None
+    job = _start(key, clip, lambda c: [
+        submit_transcription(chunk, f"{c.digest}:{i}")
+        for i, chunk in enumerate(split_chunks(c.samples))])
+    return _collect(job, wait, partial=True)
+
+def await_answer(key: str, timeout: float = STT_TIMEOUT) -> str | None:
+    """Block (up to `timeout`) for a transcription already submitted for `key`."""
+    job = _jobs().get(key)
+    if job is None:
+        return None
+    remaining = max(0.0, timeout - (time.monotonic() - job["since"]))
+    return _collect(job, remaining)
+
+def has_recording(key: str) -> bool:
+    """Has a clip been recorded for `key` (whether or not it is transcribed yet)?"""
+    return key in _jobs()
+
+def answer_confidence(key: str) -> float | None:
+    """Vocabulary-match confidence (0–100) of a single-word answer, if any."""
+    job = _jobs().get(key)
+    return job.get("confidence") if job else None
+
+def speak(text: str):
+    """
+    Queue `text` to be spoken in the browser. Playback happens in
+    `play_speech()` at the end of the run, so a prompt queued right before
+    a rerun still plays on the next page.
+    """
+    st.session_state.setdefault("_to_speak", []).append(text)
+
+def play_speech():
+    """Play queued prompts: cached audio if rendered, else the browser's voice."""
+    for text in st.session_state.pop("_to_speak", []):
+        path = tts_cache.request(text)
+        with metrics.span("speak", source="cached" if path is not None else "browser"):
+            if path is not None:
+                st.audio(path.read_bytes(), format="audio/wav", autoplay=True)
+            else:
+                components.html(f"""
+                    <script>
+                      const msg = new SpeechSynthesisUtterance({json.dumps(text)});
+                      window.speechSynthesis.speak(msg);
+                    </script>
+                """, height=0)
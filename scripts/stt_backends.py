@@ -0,0 +1,224 @@
+import hashlib
+import os
+import threading
+import time
+from dataclasses import dataclass
+from scripts.model_registry import MODEL_SIZE, get_model, warm_up as _warm_model
+
+# — CONFIG ——————————————————————————————————————————————
+# whisper | faster-whisper | stub | sidecar
+BACKEND = os.environ.get("REMINDFUL_STT_BACKEND", "whisper")
+# in-process engine used when the sidecar can't be reached
+SIDECAR_FALLBACK = os.environ.get("REMINDFUL_STT_FALLBACK", "whisper")
+
+SAMPLE_RATE = 16_000
+WINDOW_SAMPLES = 30 * SAMPLE_RATE   # Whisper's fixed input window
+
+
+@dataclass
+class Transcription:
+    """What every backend returns: the text plus where the time went."""
+    text: str
+    backend: str
+    model: str
+    audio_s: float | None = None   # clip length, when known
+    load_s: float = 0.0            # model lookup/load
+    decode_s: float = 0.0          # inference
+
+    @property
+    def real_time_factor(self) -> float | None:
+        if not self.audio_s:
+            return None
+        return (self.load_s + self.decode_s) / self.audio_s
+
+
+def _audio_seconds(audio) -> float | None:
+    return len(audio) / SAMPLE_RATE if hasattr(audio, "dtype") else None
+
+
+def batch_key(request: dict):
+    """Requests can share a forward pass only if their options match."""
+    return (request.get("model_size"), request.get("prompt"), request.get("max_tokens"))
+
+
+class STTBackend:
+    """
+    Speech-to-text engine behind `transcribe_audio`.
+    `prompt` biases decoding and `max_tokens` caps its length; both are
+    used by the single-word answer mode.
+    """
+    name = "base"
+    # True only where transcribe_batch shares one forward pass; elsewhere it
+    # decodes clip by clip and the worker pool is faster than a batch
+    supports_batch = False
+
+    def transcribe(self, audio, model_size: str | None = None,
+                   prompt: str | None = None,
+                   max_tokens: int | None = None) -> Transcription:
+        raise NotImplementedError
+
+    def transcribe_batch(self, requests: list[dict]) -> list[Transcription]:
+        """Transcribe several clips (dicts of `transcribe` kwargs) in one go."""
+        return [self.transcribe(**req) for req in requests]
+
+    def warm_up(self, model_size: str | None = None, background: bool = True):
+        return None
+
+
+class WhisperBackend(STTBackend):
+    """openai-whisper on PyTorch (the original engine)."""
+    name = "whisper"
+    supports_batch = True
+
+    def transcribe(self, audio, model_size=None, prompt=None, max_tokens=None):
+        t0 = time.perf_counter()
+        model = get_model(model_size, engine=self.name)
+        t1 = time.perf_counter()
+        options = {}
+        if prompt is not None or max_tokens is not None:
+            options = dict(initial_prompt=prompt, temperature=0.0,
+                           condition_on_previous_text=False,
+                           without_timestamps=True, sample_len=max_tokens)
+        if not hasattr(audio, "dtype"):
+            audio = str(audio)
+        result = model.transcribe(audio, **options)
+        return Transcription(result["text"], self.name, model_size or MODEL_SIZE,
+                             _audio_seconds(audio), t1 - t0, time.perf_counter() - t1)
+
+    def transcribe_batch(self, requests):
+        """
+        Clips that fit in one 30 s window and share options are decoded in
+        a single batched forward pass; anything else goes one by one.
+        """
+        batchable = (len(requests) > 1
+                     and len({batch_key(r) for r in requests}) == 1
+                     and all(hasattr(r["audio"], "dtype") and len(r["audio"]) <= WINDOW_SAMPLES
+                             for r in requests))
+        if not batchable:
+            return super().transcribe_batch(requests)
+
+        import torch
+        import whisper
+        first = requests[0]
+        size  = first.get("model_size")
+        t0 = time.perf_counter()
+        model = get_model(size, engine=self.name)
+        t1 = time.perf_counter()
+        n_mels = getattr(model.dims, "n_mels", 80)
+        mels = torch.stack([
+            whisper.log_mel_spectrogram(whisper.pad_or_trim(torch.from_numpy(r["audio"])), n_mels)
+            for r in requests
+        ]).to(model.device)
+        options = whisper.DecodingOptions(
+            prompt=first.get("prompt"), temperature=0.0, without_timestamps=True,
+            sample_len=first.get("max_tokens"), fp16=model.device.type == "cuda")
+        results = whisper.decode(model, mels, options)
+        decode_s = time.perf_counter() - t1
+        return [Transcription(res.text, self.name, size or MODEL_SIZE,
+                              _audio_seconds(r["audio"]), t1 - t0, decode_s)
+                for r, res in zip(requests, results)]
+
+    def warm_up(self, model_size=None, background=True):
+        return _warm_model(model_size, engine=self.name, background=background)
+
+
+class FasterWhisperBackend(WhisperBackend):
+    """CTranslate2 Whisper, int8 on CPU — much lighter than torch."""
+    name = "faster-whisper"
+    transcribe_batch = STTBackend.transcribe_batch   # no batched path in CTranslate2's API here
+    supports_batch   = False
+
+    def transcribe(self, audio, model_size=None, prompt=None, max_tokens=None):
+        t0 = time.perf_counter()
+        model = get_model(model_size, engine=self.name)
+        t1 = time.perf_counter()
+        options = dict(beam_size=1, initial_prompt=prompt)
+        if max_tokens is not None:
+            options.update(without_timestamps=True, max_new_tokens=max_tokens,
+                           condition_on_previous_text=False, temperature=0.0)
+        if not hasattr(audio, "dtype"):
+            audio = str(audio)
+        segments, _info = model.transcribe(audio, **options)
+        text = "".join(seg.text for seg in segments)   # generator: decoding happens here
+        return Transcription(text, self.name, model_size or MODEL_SIZE,
+                             _audio_seconds(audio), t1 - t0, time.perf_counter() - t1)
+
+
+class StubBackend(STTBackend):
+    """
+    Deterministic backend for tests and benchmarks: returns the text
+    registered for a clip (by content), or `default` for anything else.
+    """
+    name = "stub"
+    _scripted = {}
+    _lock = threading.Lock()
+
+    def __init__(self, default: str | None = None):
+        self.default = default if default is not None else os.environ.get("REMINDFUL_STT_STUB_TEXT", "")
+
+    @staticmethod
+    def fingerprint(audio) -> str:
+        raw = audio.tobytes() if hasattr(audio, "tobytes") else str(audio).encode()
+        return hashlib.sha1(raw).hexdigest()
+
+    @classmethod
+    def register(cls, audio, text: str):
+        """Make `audio` (array or path) transcribe as `text`."""
+        with cls._lock:
+            cls._scripted[cls.fingerprint(audio)] = text
+
+    def transcribe(self, audio, model_size=None, prompt=None, max_tokens=None):
+        t0 = time.perf_counter()
+        text = self._scripted.get(self.fingerprint(audio), self.default)
+        return Transcription(text, self.name, "stub", _audio_seconds(audio),
+                             0.0, time.perf_counter() - t0)
+
+
+class SidecarBackend(STTBackend):
+    """
+    Sends clips to the local `scripts.stt_server` process, so app workers
+    share one model. Falls back to decoding in-process if it's down.
+    """
+    name = "sidecar"
+
+    def transcribe(self, audio, model_size=None, prompt=None, max_tokens=None):
+        from scripts.stt_client import SidecarUnavailable, mark_down, shared_client
+        client = shared_client()
+        if client is not None:
+            try:
+                reply = client.transcribe(audio, model_size, prompt, max_tokens)
+                return Transcription(reply["text"], reply["backend"], reply["model"],
+                                     reply["audio_s"], reply["load_s"], reply["decode_s"])
+            except SidecarUnavailable:
+                mark_down()
+        return get_backend(SIDECAR_FALLBACK).transcribe(audio, model_size, prompt, max_tokens)
+
+    def warm_up(self, model_size=None, background=True):
+        return None   # the sidecar owns the model
+
+
+BACKENDS = {
+    cls.name: cls for cls in (WhisperBackend, FasterWhisperBackend,
+                              StubBackend, SidecarBackend)
+}
+
+_instances = {}
+_instances_lock = threading.Lock()
+
+
+def get_backend(name: str | None = None) -> STTBackend:
+    """The configured (or named) backend; one shared instance per name."""
+    name = name or BACKEND
+    with _instances_lock:
+        if name not in _instances:
+            try:
+                _instances[name] = BACKENDS[name]()
+            except KeyError:
+                raise ValueError(f"Unknown STT backend {name!r}; "
+                                 f"choose one of {sorted(BACKENDS)}") from None
+        return _instances[name]
+
+
+def warm_up(model_size: str | None = None, background: bool = True):
+    """Preload the configured backend's model."""
+    return get_backend().warm_up(model_size, background)
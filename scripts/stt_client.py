@@ -0,0 +1,142 @@
+import json
+import os
+import socket
+import struct
+import threading
+import time
+import numpy as np
+
+# — CONFIG ——————————————————————————————————————————————
+# unix:/path/to.sock  or  tcp:host:port
+ADDRESS     = os.environ.get("REMINDFUL_STT_SIDECAR", "unix:/tmp/remindful-stt.sock")
+TIMEOUT     = float(os.environ.get("REMINDFUL_STT_SIDECAR_TIMEOUT", "60"))
+RETRY_AFTER = 30.0   # seconds to stay on the fallback after the sidecar fails
+
+# Wire format: 4-byte big-endian header length, JSON header, raw payload
+# of header["nbytes"] bytes (float32 samples for requests, none for replies)
+_LEN = struct.Struct("!I")
+
+
+class SidecarUnavailable(ConnectionError):
+    """The transcription sidecar could not be reached."""
+
+
+def parse_address(address: str):
+    """'unix:/tmp/x.sock' / 'tcp:127.0.0.1:8765' → (socket family, address)."""
+    kind, _, rest = address.partition(":")
+    if kind == "unix":
+        return socket.AF_UNIX, rest
+    if kind == "tcp":
+        host, _, port = rest.rpartition(":")
+        return socket.AF_INET, (host or "127.0.0.1", int(port))
+    raise ValueError(f"Bad sidecar address {address!r}")
+
+
+def send_message(sock: socket.socket, header: dict, payload=b""):
+    raw = json.dumps(dict(header, nbytes=len(payload))).encode()
+    sock.sendall(_LEN.pack(len(raw)) + raw)
+    if payload:
+        sock.sendall(payload)
+
+
+def _recv_exact(sock: socket.socket, n: int) -> bytearray:
+    buf  = bytearray(n)
+    view = memoryview(buf)
+    got  = 0
+    while got < n:
+        k = sock.recv_into(view[got:])
+        if not k:
+            raise ConnectionError("connection closed mid-message")
+        got += k
+    return buf
+
+
+def recv_message(sock: socket.socket) -> tuple[dict, bytearray] | None:
+    """Next (header, payload), or None if the peer closed cleanly."""
+    first = sock.recv(_LEN.size, socket.MSG_WAITALL)
+    if not first:
+        return None
+    if len(first) < _LEN.size:
+        first += _recv_exact(sock, _LEN.size - len(first))
+    (size,) = _LEN.unpack(first)
+    header  = json.loads(_recv_exact(sock, size))
+    payload = _recv_exact(sock, header.get("nbytes", 0))
+    return header, payload
+
+
+class SidecarClient:
+    """
+    Talks to `scripts.stt_server`. Each thread keeps one open connection
+    and reuses it; a broken connection is re-opened once before giving up.
+    """
+
+    def __init__(self, address: str = ADDRESS, timeout: float = TIMEOUT):
+        self.family, self.address = parse_address(address)
+        self.timeout = timeout
+        self._local  = threading.local()
+
+    def _connect(self) -> socket.socket:
+        sock = socket.socket(self.family, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        try:
+            sock.connect(self.address)
+        except OSError as e:
+            sock.close()
+            raise SidecarUnavailable(e) from e
+        self._local.sock = sock
+        return sock
+
+    def close(self):
+        sock = getattr(self._local, "sock", None)
+        if sock is not None:
+            sock.close()
+            self._local.sock = None
+
+    def request(self, header: dict, payload=b"") -> dict:
+        for attempt in (0, 1):
+            sock = getattr(self._local, "sock", None) or self._connect()
+            try:
+                send_message(sock, header, payload)
+                reply = recv_message(sock)
+                if reply is None:
+                    raise ConnectionError("sidecar closed the connection")
+                return reply[0]
+            except (OSError, ConnectionError) as e:
+                self.close()
+                if attempt:
+                    raise SidecarUnavailable(e) from e
+
+    def transcribe(self, audio, model_size=None, prompt=None, max_tokens=None) -> dict:
+        header = {"op": "transcribe", "model_size": model_size,
+                  "prompt": prompt, "max_tokens": max_tokens}
+        if hasattr(audio, "dtype"):
+            payload = memoryview(np.ascontiguousarray(audio, dtype=np.float32)).cast("B")
+        else:
+            header["path"] = str(os.path.abspath(audio))
+            payload = b""
+        reply = self.request(header, payload)
+        if not reply.get("ok"):
+            raise RuntimeError(f"sidecar error: {reply.get('error')}")
+        return reply
+
+
+_client = None
+_down_until = 0.0
+_client_lock = threading.Lock()
+
+
+def shared_client() -> SidecarClient | None:
+    """Process-wide client, or None while the sidecar is marked down."""
+    global _client
+    if time.monotonic() < _down_until:
+        return None
+    with _client_lock:
+        if _client is None:
+            _client = SidecarClient()
+        return _client
+
+
+def mark_down():
+    """Skip the sidecar for RETRY_AFTER seconds after a failure."""
+    global _down_until
+    _down_until = time.monotonic() + RETRY_AFTER
@@ -0,0 +1,106 @@
+"""
+Local transcription sidecar: one process owns the model and serves every
+app worker on the box.
+
+    python -m scripts.stt_server --listen unix:/tmp/remindful-stt.sock --warm
+
+Point the app at it with REMINDFUL_STT_BACKEND=sidecar.
+"""
+import argparse
+import os
+import socket
+import socketserver
+import time
+import numpy as np
+from scripts.batching import MicroBatcher
+from scripts.stt_backends import BACKEND, batch_key, get_backend
+from scripts.stt_client import ADDRESS, parse_address, recv_message, send_message
+
+BATCH_WINDOW_MS = 50   # how long to wait for more requests to share a pass
+MAX_BATCH       = 16
+
+
+class Handler(socketserver.BaseRequestHandler):
+    def handle(self):
+        # one connection serves many requests (clients keep it open)
+        while True:
+            try:
+                message = recv_message(self.request)
+            except (OSError, ConnectionError):
+                return
+            if message is None:
+                return
+            header, payload = message
+            send_message(self.request, self.server.answer(header, payload))
+
+
+class _Server(socketserver.ThreadingMixIn):
+    daemon_threads = True
+
+    def answer(self, header: dict, payload) -> dict:
+        if header.get("op") == "ping":
+            return {"ok": True, "backend": self.engine.name}
+        if "path" in header:
+            audio = header["path"]
+        else:
+            audio = np.frombuffer(payload, dtype=np.float32)
+        request = {"audio": audio,
+                   "model_size": header.get("model_size"),
+                   "prompt": header.get("prompt"),
+                   "max_tokens": header.get("max_tokens")}
+        t0 = time.perf_counter()
+        try:
+            result  = self.batcher.submit(request).result()
+            latency = time.perf_counter() - t0
+        except Exception as e:
+            return {"ok": False, "error": f"{type(e).__name__}: {e}"}
+        return {"ok": True, "text": result.text, "backend": result.backend,
+                "model": result.model, "audio_s": result.audio_s,
+                "load_s": result.load_s, "decode_s": result.decode_s,
+                "server_s": latency}
+
+
+class UnixServer(_Server, socketserver.UnixStreamServer):
+    pass
+
+
+class TCPServer(_Server, socketserver.TCPServer):
+    allow_reuse_address = True
+
+
+def serve(address: str = ADDRESS, backend: str | None = None, warm: bool = False):
+    family, addr = parse_address(address)
+    engine = get_backend(backend)
+    if warm:
+        engine.warm_up(background=False)
+    if family == socket.AF_UNIX:
+        if os.path.exists(addr):
+            os.unlink(addr)
+        server = UnixServer(addr, Handler)
+    else:
+        server = TCPServer(addr, Handler)
+    server.engine  = engine
+    server.batcher = MicroBatcher(engine.transcribe_batch, BATCH_WINDOW_MS, MAX_BATCH,
+                                  key=batch_key, name="stt-batcher")
+    print(f"Remindful STT sidecar ({engine.name}) listening on {address}", flush=True)
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        if family == socket.AF_UNIX and os.path.exists(addr):
+            os.unlink(addr)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--listen", default=ADDRESS,
+                        help="unix:/path.sock or tcp:host:port (default %(default)s)")
+    parser.add_argument("--backend", default=None if BACKEND == "sidecar" else BACKEND,
+                        help="engine that owns the model (default: whisper)")
+    parser.add_argument("--warm", action="store_true", help="load the model before accepting clients")
+    args = parser.parse_args(argv)
+    serve(args.listen, args.backend or "whisper", args.warm)
+
+
+if __name__ == "__main__":
+    main()
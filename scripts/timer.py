@@ -1,20 +1,44 @@
-import time
-import streamlit as st
+from pathlib import Path
+import streamlit.components.v1 as components
+
+# Browser-side widgets: the clock runs in the page, so the server never
+# sleeps and only hears back once the task is over
+_INTERFERENCE = components.declare_component(
+    "interference_task",
+    path=str(Path(__file__).resolve().parent / "components" / "interference"),
+)
+
+def _js_countdown(label: str, seconds: int):
+    components.html(f"""
+        <h3 id="t" style="font-family:sans-serif"></h3>
+        <script>
+          const end = Date.now() + {seconds} * 1000;
+          const fmt = {label!r};
+          function draw() {{
+            const left = Math.max(0, Math.ceil((end - Date.now()) / 1000));
+            const m = String(Math.floor(left / 60)).padStart(2, "0");
+            const s = String(left % 60).padStart(2, "0");
+            document.getElementById("t").textContent =
+              fmt.replace("{{mm:ss}}", m + ":" + s).replace("{{s}}", left);
+            if (left > 0) setTimeout(draw, 250);
+            else document.getElementById("t").textContent = "";
+          }}
+          draw();
+        </script>
+    """, height=60)
 
 def countdown(minutes: int):
     """Displays a countdown timer in Streamlit for the given number of minutes."""
-    placeholder = st.empty()
-    total_seconds = minutes * 60
-    for remaining in range(total_seconds, 0, -1):
-        mins, secs = divmod(remaining, 60)
-        placeholder.markdown(f"### Distraction timer: {mins:02}:{secs:02}")
-        time.sleep(1)
-    placeholder.empty()
+    _js_countdown("Distraction timer: {mm:ss}", minutes * 60)
 
 def countdown_seconds(seconds: int):
     """Displays a countdown timer in Streamlit for the given number of seconds."""
-    placeholder = st.empty()
-    for remaining in range(seconds, 0, -1):
-        placeholder.markdown(f"### Interference countdown: {remaining} seconds remaining")
-        time.sleep(1)
-    placeholder.empty()
+    _js_countdown("Interference countdown: {s} seconds remaining", seconds)
+
+def interference_task(seconds: int = 20, interval_ms: int = 1500, key: str = "interference"):
+    """
+    Tap-on-multiples-of-3 task run entirely in the browser. Returns None
+    while it's running, then {"hits", "false_taps", "misses", "shown",
+    "reaction_ms"} — the only thing sent back to the server.
+    """
+    return _INTERFERENCE(seconds=seconds, interval_ms=interval_ms, key=key, default=None)
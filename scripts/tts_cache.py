@@ -0,0 +1,87 @@
+import hashlib
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from scripts import metrics
+
+TTS_DIR = Path(__file__).resolve().parent.parent / "audio" / "tts"
+TTS_DIR.mkdir(parents=True, exist_ok=True)
+
+VOICE = os.environ.get("REMINDFUL_TTS_VOICE") or None   # pyttsx3 voice id
+RATE  = int(os.environ.get("REMINDFUL_TTS_RATE", "160"))
+
+# Every sentence the test speaks, so they can all be rendered ahead of time
+CUE_PROMPT   = "The category is {cue}."
+RETRY_PROMPT = "The correct answer was {word}. Let's try again. What was the {cue}?"
+
+# pyttsx3 engines aren't thread-safe: one synthesis thread owns the engine
+_synth   = ThreadPoolExecutor(max_workers=1, thread_name_prefix="tts")
+_pending = {}     # path -> Future
+_lock    = threading.Lock()
+_engine  = None
+_broken  = False  # no TTS engine on this host; stop trying
+
+
+def cue_path(text: str, voice: str | None = VOICE) -> Path:
+    """Where the rendering of `text` in `voice` lives (hash-named)."""
+    digest = hashlib.sha1(f"{voice}\0{RATE}\0{text}".encode()).hexdigest()
+    return TTS_DIR / f"{digest}.wav"
+
+
+def _synthesize(text: str, voice: str | None, path: Path) -> Path | None:
+    global _engine, _broken
+    if _broken:
+        return None
+    try:
+        if _engine is None:
+            import pyttsx3
+            _engine = pyttsx3.init()
+            _engine.setProperty("rate", RATE)
+        if voice:
+            _engine.setProperty("voice", voice)
+        tmp = path.with_suffix(".tmp.wav")
+        with metrics.span("tts_synthesize"):
+            _engine.save_to_file(text, str(tmp))
+            _engine.runAndWait()
+        tmp.replace(path)
+        return path
+    except Exception:
+        # headless host without eSpeak etc. — the browser voice takes over
+        _broken = True
+        return None
+
+
+def request(text: str, voice: str | None = VOICE) -> Path | None:
+    """
+    Path of the cached audio for `text`, or None if it isn't ready yet.
+    A miss queues synthesis in the background; the caller never waits.
+    """
+    path = cue_path(text, voice)
+    if path.exists():
+        metrics.inc("tts_cache", result="hit")
+        return path
+    metrics.inc("tts_cache", result="miss")
+    if not _broken:
+        with _lock:
+            if path not in _pending:
+                fut = _synth.submit(_synthesize, text, voice, path)
+                _pending[path] = fut
+                fut.add_done_callback(lambda _f, p=path: _pending.pop(p, None))
+    return None
+
+
+def prompts_for(words: dict) -> list[str]:
+    """All spoken prompts for one test version ({cue: word})."""
+    return ([CUE_PROMPT.format(cue=cue) for cue in words]
+            + [RETRY_PROMPT.format(cue=cue, word=word) for cue, word in words.items()])
+
+
+def prerender(versions) -> int:
+    """Queue every prompt of every version ({cue: word} dicts). Returns how many were missing."""
+    missing = 0
+    for words in versions:
+        for text in prompts_for(words):
+            if request(text) is None:
+                missing += 1
+    return missing
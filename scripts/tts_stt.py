@@ -1,4 +1,46 @@
-import whisper
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from rapidfuzz import fuzz, process
+from scripts.model_registry import MODEL_SIZE
+from scripts.batching import MicroBatcher
+from scripts.phonetic import match_index
+from scripts.scoring import MATCH_THRESHOLD
+from scripts.stt_backends import batch_key, get_backend
+from scripts import metrics
+
+# — TRANSCRIPT CACHE ————————————————————————————————————
+# Keyed by clip digest (audio content + widget key) so Streamlit reruns
+# never decode the same clip twice. Shared by all sessions in the process.
+TRANSCRIPT_CACHE_SIZE = 1024
+# Re-entrant: a batched clip that is already done when submit_transcription
+# attaches its callback finishes (and caches) in the submitting thread
+_transcripts = OrderedDict()
+_transcripts_lock = threading.RLock()
+
+# — SINGLE-WORD MODE ————————————————————————————————————
+# Cued answers come from a known 16-word list, so a smaller model with a
+# biased prompt and a short greedy decode is enough
+WORD_MODEL_SIZE     = os.environ.get("REMINDFUL_WHISPER_WORD_MODEL", "tiny")
+WORD_MAX_TOKENS     = 8
+# Snap only what would score as the word anyway: a lower bar turns near
+# misses ("jello") into list words ("cello") and hides the intrusion
+WORD_SNAP_THRESHOLD = MATCH_THRESHOLD
+
+# — BACKGROUND WORKERS ——————————————————————————————————
+# Bounded pool so concurrent sessions queue here instead of in the UI thread
+STT_WORKERS = int(os.environ.get("REMINDFUL_STT_WORKERS", "2"))
+_executor = None
+_inflight = {}   # cache key -> Future, so duplicate submits share one decode
+
+# — CROSS-SESSION MICRO-BATCHING ————————————————————————
+# Single-word answers arriving within this window share one forward pass
+# (on backends that support it; the rest use the worker pool); 0 turns
+# batching off
+BATCH_WINDOW_MS = float(os.environ.get("REMINDFUL_STT_BATCH_MS", "50"))
+MAX_BATCH       = int(os.environ.get("REMINDFUL_STT_MAX_BATCH", "16"))
+_batcher = None
 
 def speak_text(text: str):
     """
@@ -13,11 +55,182 @@ def speak_text(text: str):
         # silently skip TTS if it fails
         pass
 
-def transcribe_audio(file_path):
+def transcribe_audio(audio, model_size: str | None = None):
+    """
+    Transcribe with the configured backend (REMINDFUL_STT_BACKEND).
+    `audio` is a file path or a 16 kHz mono float32 array; arrays skip
+    Whisper's ffmpeg decode entirely.
+    The model (and torch) is only loaded on first use or by warm-up.
+    """
+    return _record(get_backend().transcribe(audio, model_size)).text
+
+def transcribe_word(audio, vocabulary, model_size: str | None = None) -> tuple[str, float]:
+    """
+    Fast single-word mode for cued answers: the test's word list is fed
+    in as the prompt, decoding is greedy and capped at a few tokens, and
+    the output is snapped to the closest vocabulary word.
+    Returns (word, confidence 0–100).
+    """
+    result = _record(get_backend().transcribe(**_word_request(audio, vocabulary, model_size)))
+    return snap_to_vocabulary(result.text, vocabulary)
+
+def _record(result):
+    """Export where a transcription's time went (model lookup/load vs decode)."""
+    metrics.observe("stt_load", result.load_s, backend=result.backend)
+    metrics.observe("stt_decode", result.decode_s, backend=result.backend, model=result.model)
+    return result
+
+def _transcribe_batch(requests: list[dict]):
+    metrics.inc("stt_batches")
+    metrics.inc("stt_batched_clips", len(requests))
+    return [_record(r) for r in get_backend().transcribe_batch(requests)]
+
+def _word_request(audio, vocabulary, model_size=None) -> dict:
+    return {"audio": audio, "model_size": model_size or WORD_MODEL_SIZE,
+            "prompt": ", ".join(vocabulary) + ".", "max_tokens": WORD_MAX_TOKENS}
+
+def snap_to_vocabulary(text: str, vocabulary,
+                       threshold: float = WORD_SNAP_THRESHOLD) -> tuple[str, float]:
+    """Closest vocabulary word (lower-cased) if it clears `threshold`, else the raw text."""
+    said = text.strip().strip(".,!?;:").lower()
+    if not said:
+        return "", 0.0
+    # spelling, plural, alias or sound-alike of a list word: no fuzzy search needed
+    words = {w: w for w in vocabulary}
+    hit, how = match_index(words).lookup(said)
+    if hit is not None:
+        return hit.lower(), 100.0
+    if how == "reject":
+        return said, 0.0
+    choices = [w.lower() for w in words]
+    best = None
+    # "wood pecker" should still find "woodpecker"
+    for candidate in {said, said.replace(" ", "")}:
+        match = process.extractOne(candidate, choices, scorer=fuzz.ratio)
+        if match and (best is None or match[1] > best[1]):
+            best = match
+    if best and best[1] >= threshold:
+        return best[0], float(best[1])
+    return said, float(best[1]) if best else 0.0
+
+def _remember(key, value):
+    with _transcripts_lock:
+        _transcripts[key] = value
+        while len(_transcripts) > TRANSCRIPT_CACHE_SIZE:
+            _transcripts.popitem(last=False)
+
+def _cached(key, compute):
+    with _transcripts_lock:
+        if key in _transcripts:
+            _transcripts.move_to_end(key)
+            return _transcripts[key]
+    value = compute()
+    _remember(key, value)
+    return value
+
+def _cache_key(digest, model_size, vocabulary):
+    backend = get_backend().name
+    if vocabulary is None:
+        return (digest, backend, model_size or MODEL_SIZE)
+    return (digest, backend, model_size or WORD_MODEL_SIZE, tuple(vocabulary))
+
+def transcribe_cached(audio, digest: str | None, model_size: str | None = None,
+                      vocabulary=None):
+    """
+    Like `transcribe_audio` (or `transcribe_word` when a vocabulary is
+    given), but memoised on the clip digest.
+    Falls through to a plain decode when no digest is available.
+    """
+    if vocabulary is None:
+        compute = lambda: transcribe_audio(audio, model_size)
+    else:
+        compute = lambda: transcribe_word(audio, vocabulary, model_size)
+    if digest is None:
+        return compute()
+    return _cached(_cache_key(digest, model_size, vocabulary), compute)
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _transcripts_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=STT_WORKERS,
+                                           thread_name_prefix="stt")
+        return _executor
+
+
+def _get_batcher() -> MicroBatcher:
+    global _batcher
+    with _transcripts_lock:
+        if _batcher is None:
+            _batcher = MicroBatcher(_transcribe_batch, BATCH_WINDOW_MS, MAX_BATCH,
+                                    key=batch_key, name="stt-batcher")
+        return _batcher
+
+
+def _submit_word_batched(batcher, audio, vocabulary, model_size, key) -> Future:
+    """Queue a single-word clip on the micro-batcher; resolves to (word, confidence)."""
+    inner = batcher.submit(_word_request(audio, vocabulary, model_size))
+    outer = Future()
+    outer.add_done_callback(lambda f: f.cancelled() and inner.cancel())
+
+    def finish(f):
+        if outer.cancelled():
+            return
+        if f.cancelled():
+            outer.cancel()
+            return
+        try:
+            value = snap_to_vocabulary(f.result().text, vocabulary)
+        except Exception as e:
+            outer.set_exception(e)
+            return
+        if key[0] is not None:
+            _remember(key, value)
+        outer.set_result(value)
+
+    inner.add_done_callback(finish)
+    return outer
+
+
+def submit_transcription(audio, digest: str | None,
+                         model_size: str | None = None,
+                         vocabulary=None) -> Future:
     """
-    Lazy-load Whisper so we don’t import torch at startup.
+    Queue a clip on the shared worker pool and return a Future for its
+    text (or (word, confidence) in single-word mode). Single-word clips go
+    through the cross-session micro-batcher when the backend can decode a
+    batch in one pass, unless REMINDFUL_STT_BATCH_MS=0.
+    Cached clips come back as an already-completed Future.
     """
-    # note: this import only happens when you actually transcribe
-    model = whisper.load_model("base")
-    result = model.transcribe(str(file_path))
-    return result["text"]
\ No newline at end of file
+    vocabulary = tuple(vocabulary) if vocabulary is not None else None
+    key = _cache_key(digest, model_size, vocabulary)
+    executor = _get_executor()
+    batcher  = (_get_batcher() if vocabulary is not None and BATCH_WINDOW_MS > 0
+                and get_backend().supports_batch else None)
+    with _transcripts_lock:
+        if digest is not None and key in _transcripts:
+            metrics.inc("stt_cache", result="hit")
+            done = Future()
+            done.set_result(_transcripts[key])
+            return done
+        fut = _inflight.get(key) if digest is not None else None
+        metrics.inc("stt_cache", result="miss" if fut is None else "shared")
+        if fut is None:
+            if batcher is not None:
+                fut = _submit_word_batched(batcher, audio, vocabulary, model_size, key)
+            else:
+                fut = executor.submit(transcribe_cached, audio, digest, model_size, vocabulary)
+            if digest is not None:
+                _inflight[key] = fut
+                fut.add_done_callback(lambda _f, k=key: _inflight.pop(k, None))
+    return fut
+
+
+def queue_depth() -> int:
+    """Clips submitted but not yet finished."""
+    with _transcripts_lock:
+        return len(_inflight)
+
+metrics.gauge_fn("stt_queue_depth", queue_depth)
+metrics.gauge_fn("stt_batch_pending", lambda: _batcher.pending() if _batcher else 0)
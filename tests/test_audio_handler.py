@@ -0,0 +1,86 @@
+import io
+import wave
+import numpy as np
+import pytest
+
+pytest.importorskip("pydub")
+pytest.importorskip("streamlit")
+from scripts.audio_handler import SAMPLE_RATE, split_chunks, to_segment, trim_silence
+
+RNG = np.random.default_rng(0)
+
+
+def db(level: float) -> float:
+    """Linear amplitude of an RMS level in dBFS."""
+    return 10 ** (level / 20)
+
+
+def segment(samples: np.ndarray):
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(SAMPLE_RATE)
+        w.writeframes((np.clip(samples, -1, 1) * 32767).astype(np.int16).tobytes())
+    return to_segment(buf.getvalue())
+
+
+def noise(seconds: float, level: float) -> np.ndarray:
+    return RNG.normal(0, db(level), int(seconds * SAMPLE_RATE))
+
+
+def word(seconds: float, level: float) -> np.ndarray:
+    """A voiced burst with a speech-like envelope."""
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    env = np.sin(np.pi * t / seconds) ** 2
+    return env * np.sin(2 * np.pi * 180 * t) * db(level) * 2 ** 0.5 * 1.6
+
+
+def test_digital_silence_is_empty():
+    speech, removed = trim_silence(segment(np.zeros(5 * SAMPLE_RATE)))
+    assert speech is None and removed == 5000
+
+
+@pytest.mark.parametrize("level", [-50, -40, -30])
+def test_room_noise_alone_is_empty(level):
+    speech, removed = trim_silence(segment(noise(5, level)))
+    assert speech is None and removed == 5000
+
+
+def test_quiet_speech_over_noise_is_kept_and_trimmed():
+    clip = noise(4, -55)
+    start = 1 * SAMPLE_RATE
+    spoken = word(0.6, -32)
+    clip[start:start + len(spoken)] += spoken
+    speech, removed = trim_silence(segment(clip))
+    assert speech is not None
+    assert 600 <= len(speech) <= 1200     # the word plus a little padding
+    assert removed >= 2800
+
+
+def test_loud_speech_is_kept():
+    clip = noise(2, -70)
+    spoken = word(0.8, -12)
+    clip[8000:8000 + len(spoken)] += spoken
+    speech, _ = trim_silence(segment(clip))
+    assert speech is not None
+
+
+@pytest.mark.parametrize("seconds", [0, 1, 25])
+def test_short_audio_is_one_chunk(seconds):
+    samples = np.arange(seconds * SAMPLE_RATE)
+    assert [len(c) for c in split_chunks(samples, 25, 2)] == [len(samples)]
+
+
+@pytest.mark.parametrize("n", [25 * SAMPLE_RATE + 1, 48 * SAMPLE_RATE,
+                               48 * SAMPLE_RATE + 1, 100 * SAMPLE_RATE])
+def test_chunks_overlap_and_cover_everything(n):
+    samples = np.arange(n)
+    size, overlap = 25 * SAMPLE_RATE, 2 * SAMPLE_RATE
+    chunks = split_chunks(samples, 25, 2)
+    assert all(len(c) <= size for c in chunks)
+    assert all(len(c) > overlap for c in chunks)     # no chunk is only overlap
+    for a, b in zip(chunks, chunks[1:]):
+        assert np.array_equal(a[-overlap:], b[:overlap])
+    rebuilt = np.concatenate([chunks[0]] + [c[overlap:] for c in chunks[1:]])
+    assert np.array_equal(rebuilt, samples)
@@ -0,0 +1,22 @@
+import pytest
+from scripts.helpers import merge_transcripts
+
+
+@pytest.mark.parametrize("parts, merged", [
+    ([], ""),
+    (["apple banana"], "apple banana"),
+    (["apple banana cherry", "cherry date"], "apple banana cherry date"),
+    # the longest repeated run wins, punctuation and case aside
+    (["one two three four", "Three, four. five"], "one two three four five"),
+    (["apple banana", "grape melon"], "apple banana grape melon"),
+    (["apple", "", "apple pear"], "apple pear"),
+    # a chunk entirely inside the overlap adds nothing
+    (["red green blue", "green blue"], "red green blue"),
+])
+def test_merge_transcripts(parts, merged):
+    assert merge_transcripts(parts) == merged
+
+
+def test_overlap_longer_than_max_is_kept():
+    words = " ".join(f"w{i}" for i in range(10))
+    assert merge_transcripts([words, words], max_overlap=3) == words + " " + words
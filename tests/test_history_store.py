@@ -0,0 +1,68 @@
+import json
+import pytest
+from scripts.history_store import HistoryStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    return HistoryStore(tmp_path / "history.db")
+
+
+def save(store, session_id, user_id="ann", version="version1", completed=True):
+    store.save_session(session_id, user_id, version, demographics={}, responses={},
+                       scores={"total": 16} if completed else None, timings={},
+                       started_at="2026-01-01T10:00:00",
+                       completed_at="2026-01-01T10:10:00" if completed else None)
+
+
+def test_completed_count_ignores_unfinished_and_repeated_saves(store):
+    assert store.completed_count("ann") == 0
+    save(store, "s1", completed=False)
+    assert store.completed_count("ann") == 0
+    save(store, "s1")
+    save(store, "s1")                      # saving a finished session again
+    save(store, "s2", user_id="bob")
+    assert store.completed_count("ann") == 1
+    assert store.completed_count("bob") == 1
+    assert store.count() == 2 and store.count(completed_only=True) == 2
+
+
+@pytest.mark.parametrize("legacy", [
+    {"ann": [{"version": "version1", "total": 12}, {"version": "version2", "total": 14}]},
+    {"ann": {"version": "version1", "total": 12}},
+    [{"user_id": "ann", "version": "version1", "total": 12}],
+])
+def test_migrate_json_is_idempotent(store, tmp_path, legacy):
+    path = tmp_path / "history.json"
+    path.write_text(json.dumps(legacy))
+    added = store.migrate_json(path)
+    assert added >= 1
+    assert store.migrate_json(path) == 0
+    sessions = store.sessions_for("ann")
+    assert len(sessions) == added
+    assert sessions[0]["scores"]["total"] == 12
+    assert store.completed_count("ann") == added
+
+
+def test_migrate_json_tolerates_missing_or_broken_file(store, tmp_path):
+    assert store.migrate_json(tmp_path / "absent.json") == 0
+    (tmp_path / "broken.json").write_text("{not json")
+    assert store.migrate_json(tmp_path / "broken.json") == 0
+
+
+def test_checkpoint_is_found_by_session_and_cleared_on_completion(store):
+    store.save_checkpoint("s1", "ann", "first")
+    store.save_checkpoint("s1", "ann", "second")
+    assert store.get_checkpoint("s1") == "second"
+    assert store.get_checkpoint("ann") is None
+    save(store, "s1", completed=False)
+    assert store.get_checkpoint("s1") == "second"
+    save(store, "s1")
+    assert store.get_checkpoint("s1") is None
+
+
+def test_old_checkpoints_expire(store):
+    store.save_checkpoint("s1", "ann", "state")
+    assert store.expire_checkpoints(1) == 0
+    assert store.expire_checkpoints(-1) == 1
+    assert store.get_checkpoint("s1") is None
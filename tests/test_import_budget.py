@@ -0,0 +1,15 @@
+import pytest
+
+pytest.importorskip("streamlit")
+from scripts.import_budget import LAZY, app_imports, main
+
+
+def test_app_imports_are_read_from_app_py():
+    modules = app_imports()
+    assert "streamlit" in modules
+    assert "scripts.speech" in modules
+    assert not any(m.split(".")[0] in LAZY for m in modules)
+
+
+def test_cold_start_is_within_budget_and_lazy():
+    assert main(["--top", "5"]) == 0
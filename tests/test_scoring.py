@@ -0,0 +1,61 @@
+import json
+from pathlib import Path
+import pytest
+from scripts.phonetic import match_index
+from scripts.scoring import free_recall_hits, is_match, score_session
+from scripts.tts_stt import snap_to_vocabulary
+
+TESTS_DIR = Path(__file__).resolve().parent
+WORDS = {p.stem: json.loads(p.read_text()) for p in sorted(TESTS_DIR.glob("version*.json"))}
+ALL_WORDS = [w for words in WORDS.values() for w in words.values()]
+
+
+def cue_of(word: str) -> tuple[dict, str]:
+    for words in WORDS.values():
+        for cue, w in words.items():
+            if w == word:
+                return words, cue
+    raise KeyError(word)
+
+
+# Different words that sound or look like a test word: intrusions, not hits
+INTRUSIONS = [
+    ("coaster", "Custard"), ("caster", "Custard"), ("castor", "Custard"),
+    ("custer", "Custard"), ("mustard", "Custard"),
+    ("lament", "Lemonade"), ("macaroni", "Macaron"),
+    ("senator", "Centaur"), ("cell", "Cello"),
+    ("jello", "Cello"), ("beetle", "Beret"),
+]
+
+# Transcription slips, spellings and inflections of the word itself
+ACCEPTED = [
+    ("autumn", "Ottoman"), ("marvels", "Marbles"), ("wood pecker", "Woodpecker"),
+    ("termites", "Termite"), ("Jet-Ski", "Jet Ski"), ("bookshelves", "Bookshelf"),
+    ("purpel", "Purple"), ("center", "Centaur"), ("clarinett", "Clarinet"),
+]
+
+
+@pytest.mark.parametrize("said, word", INTRUSIONS)
+def test_intrusion_is_not_a_match(said, word):
+    words, cue = cue_of(word)
+    assert match_index(words).lookup(said)[0] is None
+    assert not is_match(said, word)
+    assert snap_to_vocabulary(said, ALL_WORDS)[0] == said
+
+
+@pytest.mark.parametrize("said, word", INTRUSIONS)
+def test_intrusion_scores_as_intrusion_in_cued_recall(said, word):
+    words, cue = cue_of(word)
+    score = score_session(words, {}, [], {cue: said})
+    assert score.cued == 0
+    assert score.intrusions == 1
+    assert cue not in free_recall_hits(words, [said])
+
+
+@pytest.mark.parametrize("said, word", ACCEPTED)
+def test_variant_is_a_match(said, word):
+    words, cue = cue_of(word)
+    assert match_index(words).lookup(said)[0] == cue
+    assert is_match(said, word)
+    score = score_session(words, {cue: said}, [said], {})
+    assert score.immediate == 1 and score.free == 1
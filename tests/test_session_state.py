@@ -0,0 +1,60 @@
+import json
+import pytest
+from scripts.session_state import Cue, InvalidTransition, Phase, SessionState
+
+
+def make_state() -> SessionState:
+    s = SessionState("abc", "2026-01-01T10:00:00", n_cues=4, user_id="ann",
+                     version="version1")
+    s.go(Phase.INSTRUCTIONS)
+    s.go(Phase.CONTROLLED)
+    s.mark(1, Cue.LEARN_SPOKEN | Cue.IMM_DONE)
+    s.demographics = {"age": 70, "use_audio": True}
+    s.responses_immediate = {"fruit": "Pomegranate"}
+    s.free_transcript = ["pomegranate", "poncho"]
+    s.confidence = {"immediate": {"fruit": 92.5}}
+    s.timings = {"controlled": "2026-01-01T10:01:00"}
+    s.free_takes = 2
+    s.audio_paths = {"free_recall_0": "/archive/ab/abcd.ogg"}
+    s.audio_clips = {"free_recall_0": "abcd"}
+    return s
+
+
+def test_dumps_loads_round_trip():
+    s = make_state()
+    assert SessionState.loads(s.dumps()) == s
+
+
+def test_loads_fills_fields_missing_from_older_checkpoints():
+    blob = json.loads(make_state().dumps())
+    for key in ("cf", "ft", "ap", "ac"):
+        del blob[key]
+    s = SessionState.loads(json.dumps(blob))
+    assert s.confidence == {} and s.free_takes == 1
+    assert s.audio_paths == {} and s.audio_clips == {}
+
+
+def test_flags_resize_to_the_word_list():
+    s = SessionState("abc", "t0", n_cues=16, flags=bytearray(4))
+    assert len(s.flags) == 16
+    assert s.first_without(Cue.LEARN_SPOKEN) == 0
+
+
+@pytest.mark.parametrize("start, target", [
+    (Phase.DEMOGRAPHICS, Phase.CONTROLLED),
+    (Phase.CONTROLLED, Phase.FREE_RECALL),
+    (Phase.RESULTS, Phase.DEMOGRAPHICS),
+])
+def test_invalid_transition_raises(start, target):
+    s = SessionState("abc", "t0", phase=start)
+    with pytest.raises(InvalidTransition):
+        s.go(target)
+    assert s.phase == start
+
+
+def test_immediate_recall_loops_back_to_learning():
+    s = SessionState("abc", "t0", phase=Phase.IMMEDIATE)
+    s.go(Phase.CONTROLLED)
+    s.go(Phase.IMMEDIATE)
+    s.go(Phase.INTERFERENCE)
+    assert s.phase == Phase.INTERFERENCE